@@ -1,8 +1,46 @@
 import bpy
+import cProfile
+import csv
+import ctypes
+import hashlib
+import json
 import os
+import re
+import shlex
+import shutil
+import struct
 import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import wraps
 from pathlib import Path
 
+# Settings shared by every FBX export, including the background export workers
+FBX_EXPORT_SETTINGS = {
+    "global_scale": 1.0,
+    "apply_unit_scale": True,
+}
+EXPORT_WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "export_worker.py")
+PROXY_WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "proxy_worker.py")
+PAINTER_STANDIN_SCRIPT = os.path.join(os.path.dirname(__file__), "painter_standin.py")
+# Hand-off file read by a running Substance Painter session, and the log its output is written to
+PAINTER_SESSION_FILE = "b2sp_session.json"
+PAINTER_LOG_FILE = "b2sp_painter.log"
+# Manifest stored next to the object folders, holding the hash of every exported fbx
+EXPORT_MANIFEST_NAME = "b2sp_manifest.json"
+# Texture files picked up by the import
+TEXTURE_FILE_TYPES = (".png", ".jpg", ".jpeg")
+# Folder in the export folder the timing logs and profiles are written to
+TIMINGS_FOLDER = "b2sp_timings"
+# Proxies are written to <object folder>/proxies/<resolution>, with a manifest of the sources they were made from
+PROXY_FOLDER = "proxies"
+PROXY_MANIFEST_NAME = "b2sp_proxies.json"
+
 # --------------------------------------------------------------------------------
 # PROPERTIES AND FOLDER PATHS
 # --------------------------------------------------------------------------------
@@ -17,6 +55,63 @@ class FolderPathPreferences(bpy.types.AddonPreferences):
     export_folder: bpy.props.StringProperty(
         name="Object export folder path", subtype="DIR_PATH", default=""
     )
+    texture_rules_file: bpy.props.StringProperty(
+        name="Custom texture naming rules",
+        description="JSON file with the naming rules used by the Custom texture preset",
+        subtype="FILE_PATH",
+        default="",
+    )
+    session_handoff: bpy.props.EnumProperty(
+        name="Session reuse",
+        description="How meshes are handed to a Substance Painter session that is already running for the export folder",
+        items=(
+            ("NEW", "Always start Painter", "Start a new Substance Painter for every export"),
+            ("COMMAND_FILE", "Command file", f"Write the meshes to {PAINTER_SESSION_FILE} in the export folder for the running session to pick up"),
+            ("COMMAND", "Command", "Run the session command with the meshes"),
+        ),
+        default="NEW",
+    )
+    session_command: bpy.props.StringProperty(
+        name="Session command",
+        description="Command handing meshes to a running session, with the placeholders {meshes}, {folder}, {spp_exe}, {python} and {standin}",
+        default="",
+    )
+    bake_command: bpy.props.StringProperty(
+        name="Batch texturing command",
+        description=(
+            "Command run for every exported mesh by the batch texturing, with the placeholders "
+            "{mesh}, {output}, {preset}, {texture_sets}, {spp_exe}, {python} and {standin}"
+        ),
+        default="",
+    )
+    bake_preset: bpy.props.StringProperty(
+        name="Batch export preset",
+        description="Substance Painter export preset passed to the batch texturing command",
+        default="Blender (Principled BSDF)",
+    )
+    bake_jobs: bpy.props.IntProperty(
+        name="Batch jobs",
+        description="Maximum number of batch texturing commands running at the same time",
+        default=2,
+        min=1,
+        max=32,
+    )
+    bake_timeout: bpy.props.FloatProperty(
+        name="Batch timeout",
+        description="Seconds after which a batch texturing command is stopped",
+        default=1800.0,
+        min=1.0,
+    )
+    record_timings: bpy.props.BoolProperty(
+        name="Record timings",
+        description=f"Time the stages of every export and import and write the timings to {TIMINGS_FOLDER} in the export folder",
+        default=False,
+    )
+    profile_runs: bpy.props.BoolProperty(
+        name="Profile with cProfile",
+        description="Also write a cProfile capture of every recorded run, slows the run down",
+        default=False,
+    )
     def draw(self, context):
         layout = self.layout
         layout.label(
@@ -24,12 +119,49 @@ class FolderPathPreferences(bpy.types.AddonPreferences):
         )
         layout.prop(self, "spp_exe")
         layout.prop(self, "export_folder")
+        layout.prop(self, "texture_rules_file")
+        layout.prop(self, "session_handoff")
+        if self.session_handoff == "COMMAND":
+            layout.prop(self, "session_command")
+        layout.label(text="Batch texturing without the Substance Painter UI")
+        layout.prop(self, "bake_command")
+        layout.prop(self, "bake_preset")
+        layout.prop(self, "bake_jobs")
+        layout.prop(self, "bake_timeout")
+        layout.label(text="Performance")
+        layout.prop(self, "record_timings")
+        row = layout.row()
+        row.enabled = self.record_timings
+        row.prop(self, "profile_runs")
+
+def update_use_proxies(self, context):
+    """Swaps every image that has a proxy between the proxy and the full resolution file"""
+    swap_proxies(self.use_proxies)
+
+def update_live_link(self, context):
+    """Starts or stops the texture watcher when live link is toggled"""
+    if self.live_link:
+        texture_watcher.start()
+    else:
+        texture_watcher.stop()
 
 class TextureSettings(bpy.types.PropertyGroup):
     """
     Class that handles which textures to include during the import
     from Substance Painter
     """    
+    texture_preset: bpy.props.EnumProperty(
+        name="Texture preset",
+        description="Substance Painter export preset the texture names are matched against",
+        items=(
+            ("DEFAULT", "Full PBR set", "Base color, roughness, metallic, normal, height, AO, emissive, opacity and packed ORM/ARM maps"),
+            ("LEGACY", "Basic", "Only base color, roughness, metallic, normal and displacement maps"),
+            ("UNREAL_PACKED", "Unreal Engine (Packed)", "BaseColor, OcclusionRoughnessMetallic, Normal, Emissive and Height maps"),
+            ("GLTF", "glTF PBR Metal Roughness", "baseColor, occlusionRoughnessMetallic, normal and emissive maps"),
+            ("CUSTOM", "Custom", "Naming rules from the JSON file set in the addon preferences"),
+        ),
+        default="DEFAULT",
+    )
     use_normal_map: bpy.props.BoolProperty(
         name="use_normal_map",
         description="Enable to use Normal Map",
@@ -45,11 +177,1395 @@ class TextureSettings(bpy.types.PropertyGroup):
         description="Enable to remove all unused image nodes, otherwise only remove on seleced material",
         default=False,
     )
+    purge_unused_images: bpy.props.BoolProperty(
+        name="Purge unused images",
+        description="Enable to also remove the images that are no longer used by any node after removing unused texture nodes",
+        default=True,
+    )
     clear_work_space: bpy.props.BoolProperty(
         name="Clean workspace",
         description="Enable to remove all nodes in the material before importing textures",
         default=True,
     )
+    import_workers: bpy.props.IntProperty(
+        name="Import workers",
+        description="Maximum number of threads reading and checking texture files ahead of the import",
+        default=4,
+        min=1,
+        max=64,
+    )
+    proxy_resolution: bpy.props.EnumProperty(
+        name="Proxy resolution",
+        description=f"Longest side of the downscaled copies written to {PROXY_FOLDER} in the object folders and loaded instead of the exported textures",
+        items=(
+            ("FULL", "Full resolution", "Load the exported textures as they are"),
+            ("512", "512", "Load 512 pixel proxies"),
+            ("1024", "1K", "Load 1024 pixel proxies"),
+            ("2048", "2K", "Load 2048 pixel proxies"),
+        ),
+        default="FULL",
+    )
+    use_proxies: bpy.props.BoolProperty(
+        name="Use proxies",
+        description="Disable to swap every image back to its full resolution file, for example for final renders",
+        default=True,
+        update=update_use_proxies,
+    )
+    proxy_workers: bpy.props.IntProperty(
+        name="Proxy workers",
+        description="Background Blender processes writing the proxies, 0 uses one per CPU core",
+        default=0,
+        min=0,
+        max=64,
+    )
+    streaming_import: bpy.props.BoolProperty(
+        name="Streaming import",
+        description=(
+            "Enable to import the materials in batches that fit the memory budget, the pixels of every batch "
+            "are freed once it is done and only read again when the viewport or a render needs them"
+        ),
+        default=False,
+    )
+    memory_budget: bpy.props.IntProperty(
+        name="Memory budget (MB)",
+        description="Estimated texture memory a streaming import batch may use",
+        default=4096,
+        min=64,
+    )
+    use_node_templates: bpy.props.BoolProperty(
+        name="Shared node templates",
+        description=(
+            "Enable to give every material an instance of a shared PBR node group, one per set of maps, "
+            "and only its own image nodes instead of a full shading graph per material"
+        ),
+        default=False,
+    )
+    incremental_sync: bpy.props.BoolProperty(
+        name="Only update changed maps",
+        description="Enable to only reload changed textures and add or remove nodes for maps that appeared or disappeared, leaving the rest of the material untouched",
+        default=False,
+    )
+    live_link: bpy.props.BoolProperty(
+        name="Live link",
+        description="Enable to watch the object folders and update the materials as soon as Substance Painter exports new textures",
+        default=False,
+        update=update_live_link,
+    )
+    live_link_interval: bpy.props.FloatProperty(
+        name="Poll interval",
+        description="Seconds between two checks of the watched object folders",
+        default=1.0,
+        min=0.1,
+        max=60.0,
+    )
+    live_link_settle_time: bpy.props.FloatProperty(
+        name="Settle time",
+        description="Seconds the textures of an object must stay unchanged before they are imported, so a burst of files is imported once",
+        default=2.0,
+        min=0.0,
+        max=60.0,
+    )
+    purge_superseded_images: bpy.props.BoolProperty(
+        name="Purge superseded images",
+        description="Enable to remove unused copies of the imported images left behind by earlier imports",
+        default=True,
+    )
+
+class ExportSettings(bpy.types.PropertyGroup):
+    """
+    Class that handles how the selected objects are written
+    during the export to Substance Painter
+    """
+    export_mode: bpy.props.EnumProperty(
+        name="Export mode",
+        description="How the selected meshes are written to FBX",
+        items=(
+            ("PER_OBJECT", "One FBX per object", "Write every object to its own FBX in its own folder"),
+            ("COMBINED", "One combined FBX", "Write the whole selection to a single FBX"),
+            ("PARALLEL", "Parallel per object", "Write one FBX per object using background Blender processes"),
+        ),
+        default="PER_OBJECT",
+    )
+    worker_count: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of background Blender processes used by the parallel export, 0 uses the CPU count",
+        default=0,
+        min=0,
+    )
+    use_export_cache: bpy.props.BoolProperty(
+        name="Skip unchanged objects",
+        description="Enable to reuse the previous fbx of objects that did not change since the last export",
+        default=True,
+    )
+    force_export: bpy.props.BoolProperty(
+        name="Force export",
+        description="Enable to export every object again, even if it did not change",
+        default=False,
+    )
+
+class OperatorProgress(bpy.types.PropertyGroup):
+    """Class that holds the progress of the running modal export or import"""
+    label: bpy.props.StringProperty(name="Label", default="")
+    done: bpy.props.IntProperty(name="Done", default=0)
+    total: bpy.props.IntProperty(name="Total", default=0)
+    is_running: bpy.props.BoolProperty(name="Running", default=False)
+
+# --------------------------------------------------------------------------------
+# PROGRESS
+# --------------------------------------------------------------------------------
+
+def redraw_panels(context):
+    """Redraws the 3D viewports so the addon panels show the latest progress"""
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+def progress_begin(context, label, total):
+    """Shows a progress bar in the Export/Import panel and the cursor"""
+    progress = context.window_manager.b2sp_progress
+    progress.label = label
+    progress.done = 0
+    progress.total = total
+    progress.is_running = True
+    context.window_manager.progress_begin(0, max(total, 1))
+    redraw_panels(context)
+
+def progress_update(context, done):
+    """Updates the progress bar to the number of finished items"""
+    context.window_manager.b2sp_progress.done = done
+    context.window_manager.progress_update(done)
+    redraw_panels(context)
+
+def progress_end(context):
+    """Hides the progress bar again"""
+    context.window_manager.b2sp_progress.is_running = False
+    context.window_manager.progress_end()
+    redraw_panels(context)
+
+# --------------------------------------------------------------------------------
+# INSTRUMENTATION
+# --------------------------------------------------------------------------------
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    """Memory counters returned by GetProcessMemoryInfo on Windows"""
+    _fields_ = [("cb", ctypes.c_uint32), ("PageFaultCount", ctypes.c_uint32)] + [
+        (name, ctypes.c_size_t) for name in (
+            "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+            "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+        )
+    ]
+
+def process_memory():
+    """Returns the current resident memory of the Blender process in bytes, or None if it cannot be read"""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = ctypes.c_void_p
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [ctypes.c_void_p, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), ctypes.c_uint32]
+        if get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+class TimingSpan:
+    """Adds the wall time of a with block to a span of the running record"""
+
+    def __init__(self, spans, name):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self._start
+        span = self._spans.setdefault(self._name, [0, 0.0, 0.0])
+        span[0] += 1
+        span[1] += duration
+        span[2] = max(span[2], duration)
+        return False
+
+class Instrumentation:
+    """
+    Timing spans and counters around the hot stages of the operators, only recorded while
+    timings are enabled in the addon preferences. Operators run from another recorded operator,
+    like the export of the batch texturing, add to the record of the outer one
+    """
+    _disabled = nullcontext()
+
+    def __init__(self):
+        self.last_record = None
+        self._record = None
+        self._owner = None
+        self._profiler = None
+
+    def begin(self, context, owner, name):
+        """Starts a record for the operator if timings are enabled and no record is running"""
+        preferences = context.preferences.addons[__package__].preferences
+        if not preferences.record_timings or self._record is not None:
+            return
+        self._owner = owner
+        self._record = {
+            "operator": name,
+            "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": time.perf_counter(),
+            "spans": {},
+            "counters": {},
+        }
+        if preferences.profile_runs:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def span(self, name):
+        """Returns a context manager timing the stage, which does nothing while no record is running"""
+        if self._record is None:
+            return self._disabled
+        return TimingSpan(self._record["spans"], name)
+
+    def count(self, name, amount=1):
+        """Adds to a counter of the running record"""
+        if self._record is not None:
+            counters = self._record["counters"]
+            counters[name] = counters.get(name, 0) + amount
+
+    @contextmanager
+    def guard(self, context, owner):
+        """Ends the record of the operator when its body raises, so a failed run never keeps recording"""
+        try:
+            yield
+        except Exception as e:
+            if self._record is not None and owner is self._owner:
+                self._record["error"] = str(e)
+            self.end(context, owner)
+            raise
+
+    def end(self, context, owner):
+        """Finishes the record the operator started and writes it to the timings folder"""
+        if self._record is None or owner is not self._owner:
+            return
+        record, self._record, self._owner = self._record, None, None
+        record["duration"] = time.perf_counter() - record["duration"]
+        record["spans"] = {
+            name: {"calls": calls, "seconds": total, "max_seconds": longest}
+            for name, (calls, total, longest) in sorted(record["spans"].items(), key=lambda item: -item[1][1])
+        }
+        folder = os.path.join(get_export_root(context), TIMINGS_FOLDER)
+        stem = f"{time.strftime('%Y%m%d_%H%M%S')}_{record['operator']}"
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if self._profiler:
+                self._profiler.disable()
+                record["profile"] = os.path.join(folder, f"{stem}.prof")
+                self._profiler.dump_stats(record["profile"])
+            record["log"] = os.path.join(folder, f"{stem}.json")
+            with open(record["log"], "w") as f:
+                json.dump(record, f, indent=2)
+            self.append_csv(os.path.join(folder, "timings.csv"), record)
+        except OSError as e:
+            print(f"B2SP: could not write the timings: {e}")
+        finally:
+            self._profiler = None
+        self.last_record = record
+        redraw_panels(context)
+
+    def append_csv(self, filepath, record):
+        """Appends one row per span and counter to a csv that collects every run"""
+        new_file = not os.path.exists(filepath)
+        with open(filepath, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["started", "operator", "kind", "name", "calls", "value", "max_seconds"])
+            writer.writerow([record["started"], record["operator"], "total", "duration", 1, f"{record['duration']:.6f}", ""])
+            for name, span in record["spans"].items():
+                writer.writerow([record["started"], record["operator"], "span", name, span["calls"], f"{span['seconds']:.6f}", f"{span['max_seconds']:.6f}"])
+            for name, value in record["counters"].items():
+                writer.writerow([record["started"], record["operator"], "counter", name, "", value, ""])
+
+instrumentation = Instrumentation()
+
+def end_record_on_error(method):
+    """
+    Runs an operator's execute, invoke or modal inside instrumentation.guard. Blender checks the
+    argument count of these methods, so the wrapper keeps the one of the method
+    """
+    if method.__code__.co_argcount == 3:
+        @wraps(method)
+        def guarded(self, context, event):
+            with instrumentation.guard(context, self):
+                return method(self, context, event)
+    else:
+        @wraps(method)
+        def guarded(self, context):
+            with instrumentation.guard(context, self):
+                return method(self, context)
+    return guarded
+
+# --------------------------------------------------------------------------------
+# EXPORT FOLDERS
+# --------------------------------------------------------------------------------
+
+def get_export_root(context):
+    """Returns the configured export folder, or the folder of the blend file if it does not exist"""
+    export_folder = context.preferences.addons[__package__].preferences.export_folder
+    if not os.path.exists(export_folder):
+        return bpy.path.abspath("//")
+    return export_folder
+
+def get_export_folder(context):
+    """Returns the folder the selection is exported to, named after the active object, or None without one"""
+    if context.active_object is None:
+        return None
+    return Path(get_export_root(context)) / context.active_object.name
+
+# --------------------------------------------------------------------------------
+# EXPORT CACHE
+# --------------------------------------------------------------------------------
+
+def hash_objects(objects, depsgraph):
+    """
+    Returns a hash of everything about the objects that ends up in their fbx: the evaluated mesh,
+    its corner normals (shading, sharp edges and custom normals), uvs, modifiers, material slots,
+    transform and export settings
+    """
+    digest = hashlib.sha1(json.dumps(FBX_EXPORT_SETTINGS, sort_keys=True).encode())
+    for obj in objects:
+        digest.update(obj.name.encode())
+        digest.update(array("f", [value for row in obj.matrix_world for value in row]).tobytes())
+        for modifier in obj.modifiers:
+            digest.update(f"{modifier.name}:{modifier.type}:{modifier.show_viewport}".encode())
+        for slot in obj.material_slots:
+            digest.update((slot.material.name if slot.material else "").encode())
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            for collection, attribute, typecode, width in (
+                (mesh.vertices, "co", "f", 3),
+                (mesh.loops, "vertex_index", "i", 1),
+                (mesh.polygons, "loop_start", "i", 1),
+                (mesh.polygons, "material_index", "i", 1),
+                (mesh.corner_normals, "vector", "f", 3),
+            ):
+                data = array(typecode, [0]) * (len(collection) * width)
+                collection.foreach_get(attribute, data)
+                digest.update(data.tobytes())
+            for uv_layer in mesh.uv_layers:
+                data = array("f", [0.0]) * (len(uv_layer.data) * 2)
+                uv_layer.data.foreach_get("uv", data)
+                digest.update(uv_layer.name.encode())
+                digest.update(data.tobytes())
+        finally:
+            obj_eval.to_mesh_clear()
+    return digest.hexdigest()
+
+def load_manifest(folder_path):
+    """Returns the export manifest of the folder, or an empty one if there is none"""
+    try:
+        with open(os.path.join(folder_path, EXPORT_MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(folder_path, manifest):
+    """Writes the export manifest next to the object folders"""
+    with open(os.path.join(folder_path, EXPORT_MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+# --------------------------------------------------------------------------------
+# TEXTURE FILES
+# --------------------------------------------------------------------------------
+
+TextureInfo = namedtuple("TextureInfo", ["filepath", "width", "height", "bit_depth", "channels", "error"])
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Channels per PNG colour type: grey, rgb, palette, grey + alpha, rgba
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+# JPEG start of frame markers, every SOFn except DHT, JPG and DAC
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+TEXTURE_HEADER_SIZE = 1024 * 1024
+TEXTURE_READ_SIZE = 4 * 1024 * 1024
+
+def parse_png_header(header):
+    """Returns (width, height, bit depth, channels) from the IHDR chunk of a png"""
+    width, height, bit_depth, colour_type = struct.unpack(">IIBB", header[16:26])
+    return width, height, bit_depth, PNG_CHANNELS.get(colour_type, 4)
+
+def parse_jpeg_header(header):
+    """Returns (width, height, bit depth, channels) from the first start of frame segment of a jpeg"""
+    position = 2
+    while position + 9 < len(header):
+        if header[position] != 0xFF:
+            position += 1
+            continue
+        marker = header[position + 1]
+        if marker in JPEG_SOF_MARKERS:
+            bit_depth, height, width, channels = struct.unpack(">BHHB", header[position + 4:position + 10])
+            return width, height, bit_depth, channels
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            position += 2 if marker != 0xFF else 1
+            continue
+        (length,) = struct.unpack(">H", header[position + 2:position + 4])
+        position += 2 + length
+    return None, None, None, None
+
+def read_texture_info(filepath, read_all=True):
+    """
+    Reads a texture file from start to end so it sits in the OS page cache for Blender,
+    or only its header if read_all is False, and checks the header. Safe to run on a
+    worker thread as it does not touch bpy
+    """
+    try:
+        with open(filepath, "rb") as f:
+            header = f.read(TEXTURE_HEADER_SIZE)
+            while read_all and f.read(TEXTURE_READ_SIZE):
+                pass
+    except OSError as e:
+        return TextureInfo(filepath, None, None, None, None, str(e))
+    if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+        return TextureInfo(filepath, *parse_png_header(header), None)
+    if header.startswith(b"\xff\xd8"):
+        return TextureInfo(filepath, *parse_jpeg_header(header), None)
+    return TextureInfo(filepath, None, None, None, None, "not a valid png or jpeg file")
+
+def texture_memory(info):
+    """Estimates the bytes Blender needs for the pixels of a texture: rgba bytes, or rgba floats above 8 bits"""
+    if info.error or info.width is None:
+        return 0
+    return info.width * info.height * 4 * (4 if info.bit_depth > 8 else 1)
+
+class TexturePrefetcher:
+    """
+    Reads and checks texture files on a pool of worker threads ahead of the main thread,
+    with read_all False only the headers are read
+    """
+
+    def __init__(self, max_workers, read_all=True):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="b2sp_texture")
+        self._futures = {}
+        self._read_all = read_all
+
+    def prefetch(self, filepaths):
+        """Queues the files that were not queued yet"""
+        for filepath in filepaths:
+            if filepath not in self._futures:
+                self._futures[filepath] = self._executor.submit(read_texture_info, filepath, self._read_all)
+
+    def get(self, filepath):
+        """Returns the TextureInfo of a file, waiting for its worker if it is still running"""
+        future = self._futures.get(filepath)
+        if future is None:
+            return read_texture_info(filepath, self._read_all)
+        return future.result()
+
+    def close(self):
+        """Stops the workers, files that were not read yet are dropped"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# --------------------------------------------------------------------------------
+# TEXTURE MAPPING
+# --------------------------------------------------------------------------------
+
+# How every texture channel is wired: (colour space, Principled BSDF input).
+# Channels without an input are connected through helper nodes in assign_textures
+TEXTURE_CHANNELS = {
+    "Base Color": ("sRGB", "Base Color"),
+    "Roughness": ("Non-Color", "Roughness"),
+    "Metallic": ("Non-Color", "Metallic"),
+    "Normal": ("Non-Color", None),
+    "Displacement": ("Non-Color", None),
+    "Height": ("Non-Color", None),
+    "Ambient Occlusion": ("Non-Color", None),
+    "Emission": ("sRGB", "Emission Color"),
+    "Opacity": ("Non-Color", "Alpha"),
+    # Packed ambient occlusion (R), roughness (G) and metallic (B), also known as ARM
+    "ORM": ("Non-Color", None),
+}
+
+# Short channel names used in the names of the shared node templates
+TEMPLATE_CHANNEL_CODES = {
+    "Base Color": "C",
+    "Roughness": "R",
+    "Metallic": "M",
+    "Normal": "N",
+    "Displacement": "D",
+    "Height": "H",
+    "Ambient Occlusion": "AO",
+    "Emission": "E",
+    "Opacity": "A",
+    "ORM": "ORM",
+}
+
+# Naming rules per Substance Painter export preset as (channel, pattern) pairs in order of
+# precedence, a file is of the first channel whose pattern is found in its lowercase name
+TEXTURE_PRESETS = {
+    "DEFAULT": (
+        ("ORM", r"occlusionroughnessmetallic|(?:^|[_\-. ])(?:orm|arm)$"),
+        ("Base Color", r"diffuse|basecolor|base[_ ]color|albedo"),
+        ("Roughness", r"roughness"),
+        ("Normal", r"normal"),
+        ("Displacement", r"displacement"),
+        ("Height", r"height"),
+        ("Metallic", r"metallic|metalness"),
+        ("Ambient Occlusion", r"ambient[_ ]?occlusion|mixed_ao|(?:^|[_\-. ])ao$"),
+        ("Emission", r"emissive|emission"),
+        ("Opacity", r"opacity|alpha"),
+    ),
+    "LEGACY": (
+        ("Base Color", r"diffuse|basecolor"),
+        ("Roughness", r"roughness"),
+        ("Normal", r"normal"),
+        ("Displacement", r"displacement"),
+        ("Metallic", r"metallic"),
+    ),
+    "UNREAL_PACKED": (
+        ("ORM", r"occlusionroughnessmetallic$"),
+        ("Base Color", r"basecolor$"),
+        ("Normal", r"normal$"),
+        ("Emission", r"emissive$"),
+        ("Height", r"height$"),
+    ),
+    "GLTF": (
+        ("ORM", r"occlusionroughnessmetallic$"),
+        ("Base Color", r"basecolor$"),
+        ("Normal", r"normal$"),
+        ("Emission", r"emissive$"),
+    ),
+}
+
+# UDIM tile sets are named name.1001.png or name_1001.png
+UDIM_PATTERN = re.compile(r"^(?P<stem>.+?)(?P<separator>[._])(?P<tile>1\d{3})$")
+
+_compiled_rules = {}
+
+def get_texture_rules(context):
+    """
+    Returns the compiled naming rules of the chosen preset, compiled once and
+    for the custom rules file again only when the file changed
+    """
+    preset = context.scene.texture_settings.texture_preset
+    if preset != "CUSTOM":
+        key = preset
+        rules = TEXTURE_PRESETS[preset]
+    else:
+        rules_file = bpy.path.abspath(context.preferences.addons[__package__].preferences.texture_rules_file)
+        key = (rules_file, os.stat(rules_file).st_mtime_ns)
+        if key not in _compiled_rules:
+            with open(rules_file) as f:
+                rules = [tuple(rule) for rule in json.load(f)["rules"]]
+            for channel, _ in rules:
+                if channel not in TEXTURE_CHANNELS:
+                    raise ValueError(f"Unknown channel {channel} in {rules_file}")
+    if key not in _compiled_rules:
+        _compiled_rules[key] = tuple((channel, re.compile(pattern)) for channel, pattern in rules)
+    return _compiled_rules[key]
+
+TextureEntry = namedtuple("TextureEntry", ["filename", "texture_type", "filepath", "files"])
+
+def get_texture_type(name, rules):
+    """Returns the texture by type"""
+    lowercase = name.lower()
+    for texture_type, pattern in rules:
+        if pattern.search(lowercase):
+            return texture_type
+    return None
+
+def get_socket(sockets, identifier):
+    """Returns a node socket by identifier, for nodes like Mix that reuse socket names"""
+    return next(socket for socket in sockets if socket.identifier == identifier)
+
+class TextureIndex:
+    """
+    Lists every texture folder once per import run and classifies each file once,
+    the materials of all selected objects then look their textures up in the index.
+    The tiles of a UDIM set are grouped into a single entry, a lone numbered file such as
+    Mat_Normal_1024.png is not a tile set and is kept as it is
+    """
+
+    def __init__(self, rules):
+        self._rules = rules
+        self._folders = {}
+        self._materials = {}
+
+    def entries(self, folder):
+        """Returns the TextureEntry of every recognised texture in the folder, scanning it only once"""
+        entries = self._folders.get(folder)
+        if entries is None:
+            entries = []
+            tile_sets = {}
+            instrumentation.count("folders_scanned")
+            with instrumentation.span("scan_folders"), os.scandir(folder) as scan:
+                for entry in scan:
+                    stem, extension = os.path.splitext(entry.name)
+                    if not extension.lower() in TEXTURE_FILE_TYPES:
+                        continue
+                    udim = UDIM_PATTERN.match(stem)
+                    if udim:
+                        tile_set = (udim["stem"], udim["separator"], extension)
+                        tile_sets.setdefault(tile_set, []).append((int(udim["tile"]), entry.path, entry.name))
+                        continue
+                    self.add_entry(entries, entry.name, entry.path)
+            for (stem, separator, extension), tiles in tile_sets.items():
+                if len(tiles) < 2:
+                    _, path, name = tiles[0]
+                    self.add_entry(entries, name, path)
+                    continue
+                texture_type = get_texture_type(stem, self._rules)
+                if texture_type:
+                    tiles.sort()
+                    filename = f"{stem}{separator}<UDIM>{extension}"
+                    files = tuple(path for _, path, _ in tiles)
+                    entries.append(TextureEntry(filename, texture_type, os.path.join(folder, filename), files))
+            entries.sort()
+            self._folders[folder] = entries
+        return entries
+
+    def add_entry(self, entries, filename, filepath):
+        """Appends the entry of a single texture file if its name is recognised"""
+        texture_type = get_texture_type(os.path.splitext(filename)[0], self._rules)
+        if texture_type:
+            entries.append(TextureEntry(filename, texture_type, filepath, (filepath,)))
+
+    def textures(self, folder, material_name):
+        """Returns the entries of the folder whose filename contains the material name"""
+        key = (folder, material_name)
+        textures = self._materials.get(key)
+        if textures is None:
+            textures = [entry for entry in self.entries(folder) if material_name in entry.filename]
+            self._materials[key] = textures
+        return textures
+
+# --------------------------------------------------------------------------------
+# IMAGE CACHE
+# --------------------------------------------------------------------------------
+
+def image_file_key(filepath):
+    """Returns the key images are cached on: the normalised absolute file path"""
+    return os.path.normcase(os.path.normpath(os.path.abspath(bpy.path.abspath(filepath))))
+
+def image_source(image):
+    """Returns the file an image was imported from, which for a proxy is the full resolution texture"""
+    return image.get("b2sp_source") or image.filepath
+
+def file_stamp(filepath):
+    """Returns a string that changes whenever the file is modified on disk"""
+    stat = os.stat(filepath)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def texture_stamp(texture):
+    """Returns a string that changes whenever any file of the texture, or UDIM tile set, is modified"""
+    return "|".join(file_stamp(filepath) for filepath in texture.files)
+
+def load_udim_image(texture):
+    """Loads a UDIM tile set as a single tiled image"""
+    image = bpy.data.images.load(texture.files[0])
+    image.source = "TILED"
+    image.filepath = texture.filepath
+    tile_numbers = [
+        int(UDIM_PATTERN.match(os.path.splitext(os.path.basename(filepath))[0])["tile"])
+        for filepath in texture.files
+    ]
+    image.tiles[0].number = tile_numbers[0]
+    for tile_number in tile_numbers[1:]:
+        image.tiles.new(tile_number=tile_number)
+    image.reload()
+    return image
+
+class ImageCache:
+    """
+    Reuses the images that are already loaded instead of adding another copy on every import,
+    an image is only reloaded when its file changed on disk since it was last loaded
+    """
+
+    def __init__(self, use_proxies=True):
+        self._images = {}
+        self._used_keys = set()
+        # Images used since the last free_batch
+        self._batch_keys = set()
+        # Full resolution filepath to proxy filepath of the textures that have an up to date proxy
+        self.proxies = {}
+        # Full resolution filepaths whose proxy is still written in the background
+        self.pending = set()
+        self._use_proxies = use_proxies
+        for image in bpy.data.images:
+            if image.source not in {"FILE", "TILED"} or not image.filepath or image.library:
+                continue
+            key = image_file_key(image_source(image))
+            current = self._images.get(key)
+            # Keep the copy that is actually used, the others are superseded
+            if current is None or image.users > current.users:
+                self._images[key] = image
+
+    def load(self, texture):
+        """Returns the image of a texture index entry, loading or reloading it only when needed"""
+        key = image_file_key(texture.filepath)
+        stamp = texture_stamp(texture)
+        image = self._images.get(key)
+        if image is None:
+            instrumentation.count("images_loaded")
+            with instrumentation.span("load_images"):
+                if "<UDIM>" in texture.filename:
+                    image = load_udim_image(texture)
+                else:
+                    image = bpy.data.images.load(self.file_to_load(texture.filepath))
+                    self.apply_proxy(image, texture.filepath)
+            self._images[key] = image
+        elif image.get("b2sp_stamp") != stamp:
+            instrumentation.count("images_reloaded")
+            with instrumentation.span("load_images"):
+                if not self.apply_proxy(image, texture.filepath):
+                    image.reload()
+        else:
+            instrumentation.count("images_reused")
+            self.apply_proxy(image, texture.filepath)
+        image["b2sp_stamp"] = stamp
+        self._used_keys.add(key)
+        self._batch_keys.add(key)
+        return image
+
+    def free_batch(self):
+        """
+        Frees the pixel buffers of the images used since the last call, they are read again
+        when the viewport or a render needs them. Returns the bytes that were loaded
+        """
+        loaded = 0
+        for key in self._batch_keys:
+            image = self._images[key]
+            memory = image_memory(image)
+            if memory:
+                loaded += memory
+                image.buffers_free()
+        self._batch_keys = set()
+        return loaded
+
+    def file_to_load(self, filepath):
+        """Returns the proxy of a texture while proxies are used, the texture itself otherwise"""
+        proxy = self.proxies.get(filepath)
+        return proxy if proxy and self._use_proxies else filepath
+
+    def apply_proxy(self, image, filepath):
+        """
+        Records the proxy of the texture on the image so it can be swapped later, and points the image
+        at the file it should show. Returns True if the filepath changed, which reloads the image
+        """
+        proxy = self.proxies.get(filepath)
+        if proxy is None:
+            if filepath not in self.pending or not image.get("b2sp_proxy"):
+                return False
+            # The proxy is outdated until it is written again, show the changed texture meanwhile
+            if image_file_key(image.filepath) == image_file_key(filepath):
+                return False
+            image.filepath = filepath
+            return True
+        image["b2sp_source"] = filepath
+        image["b2sp_proxy"] = proxy
+        target = self.file_to_load(filepath)
+        if image_file_key(image.filepath) == image_file_key(target):
+            return False
+        image.filepath = target
+        return True
+
+    def purge(self):
+        """Removes unused copies of the images loaded through the cache, returns the number removed"""
+        removed = 0
+        for image in list(bpy.data.images):
+            if image.users or image.use_fake_user or image.library or not image.filepath:
+                continue
+            key = image_file_key(image_source(image))
+            if key in self._used_keys and self._images[key] != image:
+                bpy.data.images.remove(image)
+                removed += 1
+        return removed
+
+# --------------------------------------------------------------------------------
+# BACKGROUND WORKERS
+# --------------------------------------------------------------------------------
+
+class BlenderWorkerPool:
+    """
+    Background Blender processes that each run a worker script on a job json and write their results
+    to a json of their own. The jobs, results and output logs live in a temporary work folder,
+    which is kept when something went wrong so the logs can be read
+    """
+
+    def __init__(self, prefix):
+        self.workers = []
+        self.work_dir = None
+        self._prefix = prefix
+
+    @property
+    def is_done(self):
+        return all(process.poll() is not None for process, _, _ in self.workers)
+
+    def work_folder(self):
+        """Returns the work folder, creating it on first use"""
+        if self.work_dir is None:
+            self.work_dir = tempfile.mkdtemp(prefix=self._prefix)
+        return self.work_dir
+
+    def start(self, script, job, blend_file=None):
+        """Starts a process running the script on the job, the job gets its result_path and log_path"""
+        work_dir = self.work_folder()
+        index = len(self.workers)
+        job = dict(
+            job,
+            result_path=os.path.join(work_dir, f"result_{index}.json"),
+            log_path=os.path.join(work_dir, f"worker_{index}.log"),
+        )
+        job_path = os.path.join(work_dir, f"job_{index}.json")
+        with open(job_path, "w") as f:
+            json.dump(job, f)
+        log_file = open(job["log_path"], "w")
+        args = [bpy.app.binary_path, "-b", "--factory-startup"]
+        if blend_file:
+            args.append(blend_file)
+        process = subprocess.Popen(
+            args + ["--python", script, "--", job_path],
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        self.workers.append((process, job, log_file))
+
+    def wait(self):
+        """Waits for every process to exit"""
+        for process, _, _ in self.workers:
+            process.wait()
+
+    def results(self):
+        """Waits for the processes and returns (process, job, results), results is None if a process wrote none"""
+        collected = []
+        for process, job, log_file in self.workers:
+            process.wait()
+            log_file.close()
+            try:
+                with open(job["result_path"]) as f:
+                    results = json.load(f)
+            except (OSError, ValueError):
+                results = None
+            collected.append((process, job, results))
+        return collected
+
+    def close(self, keep_logs=False):
+        """Forgets the processes and removes the work folder, unless keep_logs is set"""
+        if self.work_dir and not keep_logs:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.workers = []
+        self.work_dir = None
+
+    def cancel(self):
+        """Stops the running processes and removes the work folder"""
+        for process, _, log_file in self.workers:
+            process.kill()
+            process.wait()
+            log_file.close()
+        self.close()
+
+# --------------------------------------------------------------------------------
+# TEXTURE PROXIES
+# --------------------------------------------------------------------------------
+
+def swap_proxies(use_proxies):
+    """Points every image that has a proxy at the proxy or at its full resolution file, returns the number swapped"""
+    swapped = 0
+    for image in bpy.data.images:
+        source, proxy = image.get("b2sp_source"), image.get("b2sp_proxy")
+        if not source or not proxy:
+            continue
+        target = proxy if use_proxies and os.path.exists(proxy) else source
+        if image_file_key(image.filepath) != image_file_key(target):
+            image.filepath = target
+            swapped += 1
+    return swapped
+
+class ProxyBuilder:
+    """
+    Keeps downscaled copies of the textures in proxies/<resolution> next to the originals. Missing and
+    outdated proxies are written in parallel by background Blender processes, off the main thread,
+    and a proxy is only written again once its source changed
+    """
+
+    def __init__(self, resolution, max_workers):
+        self.resolution = resolution
+        self.proxies = {}
+        self._max_workers = max_workers
+        self._manifests = {}
+        self._pending = []
+        self._pool = BlenderWorkerPool("b2sp_proxies_")
+
+    @property
+    def is_done(self):
+        return self._pool.is_done
+
+    @property
+    def pending(self):
+        """The full resolution filepaths whose proxy is missing or outdated"""
+        return {source for source, _, _ in self._pending}
+
+    def check(self, textures, prefetcher):
+        """Sorts the textures into proxies that are up to date and ones that have to be written"""
+        for texture in textures:
+            # UDIM tile sets keep their full resolution
+            if len(texture.files) > 1:
+                continue
+            proxy_folder = os.path.join(os.path.dirname(texture.filepath), PROXY_FOLDER, str(self.resolution))
+            manifest = self._manifests.get(proxy_folder)
+            if manifest is None:
+                try:
+                    with open(os.path.join(proxy_folder, PROXY_MANIFEST_NAME)) as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError):
+                    manifest = {}
+                self._manifests[proxy_folder] = manifest
+            proxy = os.path.join(proxy_folder, texture.filename)
+            stamp = texture_stamp(texture)
+            entry = manifest.get(texture.filename)
+            if entry and entry["stamp"] == stamp and (not entry["proxy"] or os.path.exists(proxy)):
+                if entry["proxy"]:
+                    self.proxies[texture.filepath] = proxy
+                continue
+            info = prefetcher.get(texture.filepath)
+            if info.error or info.width is None:
+                continue
+            if max(info.width, info.height) <= self.resolution:
+                # Already small enough, remembered so the file is not read again
+                manifest[texture.filename] = {"stamp": stamp, "proxy": False}
+                continue
+            self._pending.append((texture.filepath, proxy, stamp))
+
+    def start(self):
+        """Starts the background processes writing the pending proxies, returns False if there are none"""
+        if not self._pending:
+            return False
+        worker_count = min(self._max_workers or os.cpu_count() or 1, len(self._pending))
+        for index in range(worker_count):
+            self._pool.start(PROXY_WORKER_SCRIPT, {
+                "resolution": self.resolution,
+                "images": [{"source": source, "proxy": proxy} for source, proxy, _ in self._pending[index::worker_count]],
+            })
+        return True
+
+    def finish(self):
+        """Waits for the workers, records the written proxies in the manifests and returns the errors"""
+        stamps = {proxy: stamp for _, proxy, stamp in self._pending}
+        errors = []
+        for process, job, results in self._pool.results():
+            if results is None:
+                errors.append(f"Proxy worker failed with exit code {process.returncode}, see {job['log_path']}")
+                continue
+            for result in results:
+                if result["error"]:
+                    errors.append(f"Could not write the proxy of {result['source']}: {result['error']}")
+                    continue
+                proxy_folder, filename = os.path.split(result["proxy"])
+                self._manifests[proxy_folder][filename] = {"stamp": stamps[result["proxy"]], "proxy": True}
+                self.proxies[result["source"]] = result["proxy"]
+        for proxy_folder, manifest in self._manifests.items():
+            if manifest:
+                os.makedirs(proxy_folder, exist_ok=True)
+                with open(os.path.join(proxy_folder, PROXY_MANIFEST_NAME), "w") as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+        self._pool.close(keep_logs=bool(errors))
+        self._pending = []
+        return errors
+
+    def cancel(self):
+        """Stops the workers, proxies that were not recorded yet are written again next time"""
+        self._pool.cancel()
+        self._pending = []
+
+def attach_proxies(proxies):
+    """Records the proxies on the images of their textures that were loaded before the proxy existed"""
+    sources = {image_file_key(source): (source, proxy) for source, proxy in proxies.items()}
+    for image in bpy.data.images:
+        if image.get("b2sp_proxy") or image.source != "FILE" or not image.filepath:
+            continue
+        match = sources.get(image_file_key(image.filepath))
+        if match:
+            image["b2sp_source"], image["b2sp_proxy"] = match
+
+class BackgroundProxies:
+    """
+    Finishes the proxy builders of imports that did not wait for them from a bpy.app.timers callback,
+    the images those imports loaded at full resolution switch to their proxies once they are written
+    """
+
+    def __init__(self):
+        self._builders = []
+
+    def add(self, builder):
+        """Takes over a builder whose workers are still running"""
+        self._builders.append(builder)
+        if not bpy.app.timers.is_registered(self.tick):
+            bpy.app.timers.register(self.tick, first_interval=0.5, persistent=True)
+
+    def stop(self):
+        """Unregisters the timer and stops the workers, their proxies are written again next time"""
+        if bpy.app.timers.is_registered(self.tick):
+            bpy.app.timers.unregister(self.tick)
+        for builder in self._builders:
+            builder.cancel()
+        self._builders = []
+
+    def tick(self):
+        """Finishes the builders that are done, returns the delay to the next tick while some are running"""
+        done = [builder for builder in self._builders if builder.is_done]
+        for builder in done:
+            self._builders.remove(builder)
+            try:
+                for error in builder.finish():
+                    print(f"B2SP: {error}")
+                attach_proxies(builder.proxies)
+            except OSError as e:
+                print(f"B2SP: could not finish the proxies: {e}")
+        if done and bpy.context.scene:
+            swap_proxies(bpy.context.scene.texture_settings.use_proxies)
+        return 0.5 if self._builders else None
+
+background_proxies = BackgroundProxies()
+
+# --------------------------------------------------------------------------------
+# UNUSED TEXTURE CLEANUP
+# --------------------------------------------------------------------------------
+
+# Nodes that end a material node tree
+OUTPUT_NODE_TYPES = {"OUTPUT_MATERIAL", "OUTPUT_AOV"}
+# Helper nodes an image is connected through, removed together with the image nodes feeding them
+TEXTURE_HELPER_NODE_TYPES = {"NORMAL_MAP", "BUMP", "SEPARATE_COLOR"}
+
+def find_unused_texture_nodes(node_tree):
+    """
+    Returns the names of the image nodes that cannot reach an output of the node tree,
+    together with the unreachable helper nodes they feed. Links are read only once
+    """
+    inputs = {}
+    outputs = {}
+    for link in node_tree.links:
+        if link.is_muted or not link.is_valid:
+            continue
+        inputs.setdefault(link.to_node.name, []).append(link.from_node.name)
+        outputs.setdefault(link.from_node.name, []).append(link.to_node.name)
+    node_types = {node.name: node.type for node in node_tree.nodes}
+    # Walk back from the outputs, everything on the way is in use
+    reachable = set()
+    stack = [name for name, node_type in node_types.items() if node_type in OUTPUT_NODE_TYPES]
+    while stack:
+        name = stack.pop()
+        if name not in reachable:
+            reachable.add(name)
+            stack.extend(inputs.get(name, ()))
+    unused = [name for name, node_type in node_types.items() if node_type == "TEX_IMAGE" and name not in reachable]
+    # Follow the unused image nodes forward to the unreachable helper nodes they feed
+    stack = list(unused)
+    removed = set(unused)
+    while stack:
+        for name in outputs.get(stack.pop(), ()):
+            if name not in removed and name not in reachable and node_types[name] in TEXTURE_HELPER_NODE_TYPES:
+                removed.add(name)
+                unused.append(name)
+                stack.append(name)
+    return unused
+
+def image_memory(image):
+    """Returns the bytes of the image's loaded pixel buffers, 0 if its pixels are not loaded"""
+    if not image.has_data:
+        return 0
+    bytes_per_channel = 4 if image.is_float else 1
+    if image.source == "TILED":
+        pixels = sum(tile.size[0] * tile.size[1] for tile in image.tiles)
+    else:
+        pixels = image.size[0] * image.size[1]
+    return pixels * image.channels * bytes_per_channel
+
+def purge_images(images):
+    """Removes the images that have no users left, returns the number removed and the bytes freed"""
+    removed = 0
+    freed = 0
+    for image in images:
+        if image.users or image.use_fake_user or image.library or image.type != "IMAGE":
+            continue
+        freed += image_memory(image)
+        bpy.data.images.remove(image)
+        removed += 1
+    return removed, freed
+
+# --------------------------------------------------------------------------------
+# LIVE LINK
+# --------------------------------------------------------------------------------
+
+def scan_textures(folder):
+    """Returns {filename: (mtime, size)} of the textures in a folder with a single scandir"""
+    snapshot = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(TEXTURE_FILE_TYPES):
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return snapshot
+
+class TextureWatcher:
+    """
+    Polls the object folders under the export folder from a bpy.app.timers callback and
+    imports the textures of an object once its files stopped changing for the settle time
+    """
+    # Limits how many folders are checked per tick so many watched objects never cost a long frame
+    FOLDERS_PER_TICK = 16
+
+    def __init__(self):
+        self._snapshots = {}
+        self._changed = {}
+        self._folders = []
+        self._cursor = 0
+
+    def start(self):
+        """Registers the timer, the first full scan only records the current state of the folders"""
+        if not bpy.app.timers.is_registered(self.tick):
+            self._snapshots.clear()
+            self._changed.clear()
+            self._folders = []
+            self._cursor = 0
+            bpy.app.timers.register(self.tick, first_interval=0.1, persistent=True)
+
+    def stop(self):
+        """Unregisters the timer"""
+        if bpy.app.timers.is_registered(self.tick):
+            bpy.app.timers.unregister(self.tick)
+
+    def find_folders(self, context):
+        """Returns the export folder/group/object folders of the mesh objects in the scene"""
+        names = {obj.name for obj in context.scene.objects if obj.type == "MESH"}
+        folders = []
+        try:
+            with os.scandir(get_export_root(context)) as groups:
+                for group in groups:
+                    if not group.is_dir():
+                        continue
+                    with os.scandir(group.path) as entries:
+                        folders.extend(entry.path for entry in entries if entry.is_dir() and entry.name in names)
+        except OSError:
+            pass
+        return folders
+
+    def tick(self):
+        """Checks the next few folders and imports the ones that settled, returns the delay to the next tick"""
+        context = bpy.context
+        texture_settings = context.scene.texture_settings
+        if not texture_settings.live_link:
+            return None
+        try:
+            if self._cursor >= len(self._folders):
+                self._folders = self.find_folders(context)
+                self._cursor = 0
+            now = time.monotonic()
+            for folder in self._folders[self._cursor:self._cursor + self.FOLDERS_PER_TICK]:
+                snapshot = scan_textures(folder)
+                previous = self._snapshots.get(folder)
+                self._snapshots[folder] = snapshot
+                if previous is not None and snapshot != previous:
+                    self._changed[folder] = now
+            self._cursor += self.FOLDERS_PER_TICK
+            settled = [
+                folder for folder, changed_at in self._changed.items()
+                if now - changed_at >= texture_settings.live_link_settle_time
+            ]
+            for folder in settled:
+                del self._changed[folder]
+            if settled:
+                self.apply(context, settled)
+        except Exception as e:
+            print(f"B2SP live link failed with error: {str(e)}")
+        return texture_settings.live_link_interval
+
+    def apply(self, context, folders):
+        """Imports the textures of the settled folders, one import per parent folder"""
+        by_parent = {}
+        for folder in folders:
+            obj = context.scene.objects.get(os.path.basename(folder))
+            if obj is not None and obj.type == "MESH":
+                by_parent.setdefault(os.path.dirname(folder), []).append(obj)
+        for parent_folder, objects in by_parent.items():
+            with context.temp_override(selected_objects=objects):
+                getattr(bpy.ops, "import").textures(folder=parent_folder, incremental=True)
+
+texture_watcher = TextureWatcher()
+
+@bpy.app.handlers.persistent
+def start_live_link_on_load(dummy):
+    """Starts the texture watcher for files that were saved with live link enabled"""
+    if bpy.context.scene and bpy.context.scene.texture_settings.live_link:
+        texture_watcher.start()
+
+# --------------------------------------------------------------------------------
+# PAINTER SESSIONS
+# --------------------------------------------------------------------------------
+
+def format_command(command, spp_exe, values):
+    """
+    Splits a command template from the preferences and fills in its placeholders,
+    {spp_exe}, {python} and {standin} are available to every command
+    """
+    values = dict(values, spp_exe=spp_exe, python=sys.executable, standin=PAINTER_STANDIN_SCRIPT)
+    tokens = shlex.split(command, posix=os.name != "nt")
+    return [token.strip('"').format(**values) for token in tokens]
+
+class PainterSessionManager:
+    """
+    Keeps track of every Substance Painter process started per export folder and reuses a running
+    session through a command file or command instead of starting another Painter.
+    The output of every session is appended to a log file so it can never block on a full pipe
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def open(self, spp_exe, folder, mesh_paths, handoff, command):
+        """Opens the meshes in Substance Painter, returns True if a running session was reused"""
+        sessions = self._sessions.setdefault(folder, [])
+        running = [session for session in sessions if session["process"].poll() is None]
+        if running and handoff != "NEW":
+            if handoff == "COMMAND_FILE":
+                self.write_command_file(folder, mesh_paths)
+            else:
+                self.run_command(command, spp_exe, folder, mesh_paths)
+            running[-1]["meshes"] = list(mesh_paths)
+            return True
+        args = [spp_exe] + [
+            mesh for path in mesh_paths for mesh in ["--mesh", path]
+        ]
+        with open(os.path.join(folder, PAINTER_LOG_FILE), "a") as log_file:
+            process = subprocess.Popen(args, stdout=log_file, stderr=subprocess.STDOUT)
+        sessions.append({"process": process, "meshes": list(mesh_paths), "started": time.time()})
+        return False
+
+    def write_command_file(self, folder, mesh_paths):
+        """Writes the hand-off file in one step so the session never reads half of it"""
+        command_path = os.path.join(folder, PAINTER_SESSION_FILE)
+        with open(command_path + ".tmp", "w") as f:
+            json.dump({"meshes": list(mesh_paths), "requested": time.time()}, f, indent=2)
+        os.replace(command_path + ".tmp", command_path)
+
+    def run_command(self, command, spp_exe, folder, mesh_paths):
+        """Runs the session command, its output is appended to the session log"""
+        if not command:
+            raise ValueError("No session command set in the addon preferences")
+        args = format_command(command, spp_exe, {"meshes": ",".join(mesh_paths), "folder": folder})
+        with open(os.path.join(folder, PAINTER_LOG_FILE), "a") as log_file:
+            subprocess.Popen(args, stdout=log_file, stderr=subprocess.STDOUT)
+
+    def sessions(self):
+        """Returns (folder, pid, exit code or None while running) for every tracked session"""
+        return [
+            (folder, session["process"].pid, session["process"].poll())
+            for folder, sessions in self._sessions.items()
+            for session in sessions
+        ]
+
+    def stop(self, folder, pid=0):
+        """Stops a session of a folder, or every session of it without a pid, and forgets the ones that exited"""
+        sessions = self._sessions.get(folder, [])
+        for session in [session for session in sessions if not pid or session["process"].pid == pid]:
+            if session["process"].poll() is None:
+                session["process"].terminate()
+            sessions.remove(session)
+        if not sessions:
+            self._sessions.pop(folder, None)
+
+painter_sessions = PainterSessionManager()
+
+# --------------------------------------------------------------------------------
+# PAINTER BATCH TEXTURING
+# --------------------------------------------------------------------------------
+
+class PainterBakeQueue:
+    """
+    Runs batch texturing jobs through the configured command with at most max_jobs
+    running at a time, jobs that run longer than the timeout are stopped
+    """
+
+    def __init__(self, command, preset, spp_exe, max_jobs, timeout):
+        self._command = command
+        self._preset = preset
+        self._spp_exe = spp_exe
+        self._max_jobs = max_jobs
+        self._timeout = timeout
+        self._pending = deque()
+        self._running = []
+
+    @property
+    def is_done(self):
+        return not self._pending and not self._running
+
+    def submit(self, name, mesh_path, output_folder, texture_sets):
+        """Queues the texturing of one exported mesh"""
+        self._pending.append({
+            "name": name,
+            "mesh": mesh_path,
+            "output": output_folder,
+            "texture_sets": texture_sets,
+            "log_path": os.path.join(output_folder, "b2sp_bake.log"),
+            "returncode": None,
+            "timed_out": False,
+            "error": None,
+            "duration": 0.0,
+        })
+
+    def build_command(self, job):
+        """Splits the command template and fills in the placeholders of the job"""
+        values = {
+            "mesh": job["mesh"],
+            "output": job["output"],
+            "preset": self._preset,
+            "texture_sets": ",".join(job["texture_sets"]),
+        }
+        return format_command(self._command, self._spp_exe, values)
+
+    def poll(self):
+        """Starts queued jobs while there is room and returns the jobs that finished since the last poll"""
+        finished = []
+        now = time.monotonic()
+        for job in list(self._running):
+            process = job["process"]
+            if process.poll() is None and now - job["start"] > self._timeout:
+                process.kill()
+                process.wait()
+                job["timed_out"] = True
+            if process.poll() is not None:
+                job["log"].close()
+                job["returncode"] = process.returncode
+                job["duration"] = now - job["start"]
+                self._running.remove(job)
+                finished.append(job)
+        while self._pending and len(self._running) < self._max_jobs:
+            job = self._pending.popleft()
+            job["log"] = open(job["log_path"], "w")
+            try:
+                job["process"] = subprocess.Popen(self.build_command(job), stdout=job["log"], stderr=subprocess.STDOUT)
+            except (OSError, KeyError, ValueError) as e:
+                job["log"].close()
+                job["error"] = str(e)
+                finished.append(job)
+                continue
+            job["start"] = time.monotonic()
+            self._running.append(job)
+        return finished
+
+    def cancel(self):
+        """Stops the running jobs and drops the queued ones"""
+        self._pending.clear()
+        for job in self._running:
+            job["process"].kill()
+            job["process"].wait()
+            job["log"].close()
+        self._running.clear()
 
 # --------------------------------------------------------------------------------
 # EXPORT AND IMPORT OPERATORS
@@ -60,39 +1576,154 @@ class EXPORT_OT_SubstancePainterExporter(bpy.types.Operator):
     bl_idname = "export.substance_painter"
     bl_label = "Export to Substance Painter"
 
+    launch_painter: bpy.props.BoolProperty(
+        name="Launch Substance Painter",
+        description="Open Substance Painter with the exported meshes once the export is done",
+        default=True,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+
+    @end_record_on_error
     def execute(self, context):
-        preferences = context.preferences
-        export_folder = preferences.addons[__package__].preferences.export_folder
-        substance_painter_path = preferences.addons[__package__].preferences.spp_exe
-        objects = context.selected_objects
-        # Check if export folder path exists, if not export textures in the same folder as blend file
-        if not os.path.exists(export_folder):
-            export_folder = Path(bpy.path.abspath("//"))
-        if not objects:
-            self.report({"INFO"}, "No object selected")
+        instrumentation.begin(context, self, "export")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
             return {"CANCELLED"}
-        # List to store all the export paths
-        export_paths = []
-        # Append the paths to the export list
-        folder_name = bpy.context.active_object.name
-        folder_path = Path(export_folder) / folder_name
         #make subfolders for each object and export them to substancepainter
         try:
-            folder_path.mkdir(parents=True, exist_ok=True)
-            export_paths = []
-            for obj in objects:
-                obj_folder = folder_path / obj.name
-                obj_folder.mkdir(parents=True, exist_ok=True)
-                export_result = self.export_object(str(obj_folder), obj)
-                if export_result:
-                    export_paths.append(export_result)
-            if export_paths:
-                self.open_substance_painter(export_paths, substance_painter_path)
-            return {"FINISHED"}
+            if self._export_mode == "PARALLEL":
+                self.start_workers(context, self._folder_path, self._objects)
+                with instrumentation.span("workers"):
+                    self._pool.wait()
+                self._export_paths = self.collect_workers()
+            else:
+                for obj in self._queue:
+                    self.export_step(obj)
+            return self.finish(context)
+
+        except Exception as e:
+            instrumentation.end(context, self)
+            self.report({"ERROR"}, f"Failed to export objects with error: {str(e)}")
+            return {"CANCELLED"}
+
+    @end_record_on_error
+    def invoke(self, context, event):
+        """
+        Runs the export one object per timer tick, or polls the background workers
+        in parallel mode, so the UI stays responsive and the export can be cancelled with Esc
+        """
+        instrumentation.begin(context, self, "export")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
+            return {"CANCELLED"}
+        total = len(self._queue)
+        try:
+            if self._export_mode == "PARALLEL":
+                if not self.start_workers(context, self._folder_path, self._objects):
+                    # Nothing left to export, the cached fbx files can be opened right away
+                    self._export_paths = self.collect_workers()
+                    return self.finish(context)
+                total = sum(len(job["objects"]) for _, job, _ in self._pool.workers)
+        except Exception as e:
+            instrumentation.end(context, self)
+            self.report({"ERROR"}, f"Failed to export objects with error: {str(e)}")
+            return {"CANCELLED"}
+        progress_begin(context, "Exporting", total)
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.25 if self._export_mode == "PARALLEL" else 0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
 
+    @end_record_on_error
+    def modal(self, context, event):
+        """Exports the next queued object on every timer tick and opens Substance Painter once all of them are done"""
+        if event.type == "ESC":
+            self.stop_modal(context)
+            if self._export_mode == "PARALLEL":
+                self._pool.cancel()
+            # Keep the manifest in sync with the objects that were already written
+            save_manifest(self._folder_path, self._manifest)
+            instrumentation.end(context, self)
+            self.report({"WARNING"}, f"Export cancelled, {len(self._export_paths)} objects were exported")
+            return {"CANCELLED"}
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+        try:
+            if self.export_pending(context):
+                return {"PASS_THROUGH"}
         except Exception as e:
+            self.stop_modal(context)
+            instrumentation.end(context, self)
             self.report({"ERROR"}, f"Failed to export objects with error: {str(e)}")
             return {"CANCELLED"}
+        self.stop_modal(context)
+        return self.finish(context)
+
+    def prepare(self, context):
+        """Collects the selection and the export folder, returns False if there is nothing to export"""
+        objects = context.selected_objects
+        if not objects:
+            self.report({"INFO"}, "No object selected")
+            return False
+        self._folder_path = get_export_folder(context)
+        if self._folder_path is None:
+            self.report({"INFO"}, "No active object, the export folder is named after it")
+            return False
+        self._objects = list(objects)
+        self._export_mode = context.scene.export_settings.export_mode
+        self._folder_path.mkdir(parents=True, exist_ok=True)
+        with instrumentation.span("manifest"):
+            self._manifest = load_manifest(self._folder_path)
+        # List to store all the export paths
+        self._export_paths = []
+        self._pool = BlenderWorkerPool("b2sp_export_")
+        # Combined mode writes the whole selection in a single step
+        self._queue = [None] if self._export_mode == "COMBINED" else self._objects
+        self._queue_index = 0
+        return True
+
+    def export_step(self, obj):
+        """Exports a single queued object, or the whole selection in combined mode"""
+        if self._export_mode == "COMBINED":
+            export_result = self.export_combined(str(self._folder_path), self._folder_path.name, self._objects)
+        else:
+            obj_folder = self._folder_path / obj.name
+            obj_folder.mkdir(parents=True, exist_ok=True)
+            export_result = self.export_object(str(obj_folder), obj)
+        if export_result:
+            self._export_paths.append(export_result)
+
+    def export_pending(self, context):
+        """Advances the modal export by one object, returns True while there is work left"""
+        if self._export_mode == "PARALLEL":
+            done = sum(len(job["objects"]) for process, job, _ in self._pool.workers if process.poll() is not None)
+            progress_update(context, done)
+            if not self._pool.is_done:
+                return True
+            self._export_paths = self.collect_workers()
+            return False
+        if self._queue_index < len(self._queue):
+            self.export_step(self._queue[self._queue_index])
+            self._queue_index += 1
+            progress_update(context, self._queue_index)
+            return True
+        return False
+
+    def stop_modal(self, context):
+        """Removes the modal timer and the progress bar"""
+        context.window_manager.event_timer_remove(self._timer)
+        progress_end(context)
+
+    def finish(self, context):
+        """Saves the export manifest and opens Substance Painter with the exported fbx files"""
+        with instrumentation.span("manifest"):
+            save_manifest(self._folder_path, self._manifest)
+        if self._export_paths and self.launch_painter:
+            substance_painter_path = context.preferences.addons[__package__].preferences.spp_exe
+            with instrumentation.span("open_painter"):
+                self.open_substance_painter(self._export_paths, substance_painter_path)
+        instrumentation.end(context, self)
+        return {"FINISHED"}
 
     def check_material(self, obj):
         """checks if object has any materials and nodes enabled"""
@@ -104,7 +1735,9 @@ class EXPORT_OT_SubstancePainterExporter(bpy.types.Operator):
             self.report({"INFO"}, f"{obj.name} has a {obj.name}_material added to it")
         else:
             for mat in obj.data.materials:
-                mat.name = obj.name+"_"+mat.name
+                # Only prefix once so repeated exports keep the same material names
+                if mat and not mat.name.startswith(obj.name+"_"):
+                    mat.name = obj.name+"_"+mat.name
 
     def export_object(self, export_folder, obj):
         """Return the fbx filepath and exports the mesh from blender to the specificed folderpath"""
@@ -114,13 +1747,14 @@ class EXPORT_OT_SubstancePainterExporter(bpy.types.Operator):
             # Export object
             export_name = f"{obj.name}.fbx"           
             export_path = os.path.normpath(os.path.join(export_folder, export_name))
-            bpy.ops.export_scene.fbx(
-                filepath=export_path,
-                global_scale=1.0,
-                apply_unit_scale=True,
-                use_selection=True,
-            )
-            self.report({"INFO"}, f"Exported {obj.name} to {export_path}")
+            digest, up_to_date = self.check_cache(export_path, [obj])
+            if up_to_date:
+                instrumentation.count("objects_cached")
+                self.report({"INFO"}, f"{obj.name} is unchanged, reusing {export_path}")
+                return export_path
+            size, duration = self.export_fbx(export_path, [obj])
+            self.store_cache(export_path, digest)
+            self.report({"INFO"}, f"Exported {obj.name} to {export_path} ({size} bytes in {duration:.2f}s)")
             # Return the path to the export list
             return export_path
         else:
@@ -129,20 +1763,162 @@ class EXPORT_OT_SubstancePainterExporter(bpy.types.Operator):
             )
             return None
 
+    def export_combined(self, export_folder, export_name, objects):
+        """Return the fbx filepath and exports all selected meshes into a single fbx file"""
+        meshes = [obj for obj in objects if obj.type == "MESH"]
+        if not meshes:
+            self.report({"WARNING"}, "No mesh objects selected, skipping mesh export.")
+            return None
+        for obj in meshes:
+            self.check_material(obj)
+        export_path = os.path.normpath(os.path.join(export_folder, f"{export_name}.fbx"))
+        digest, up_to_date = self.check_cache(export_path, meshes)
+        if up_to_date:
+            instrumentation.count("objects_cached", len(meshes))
+            self.report({"INFO"}, f"Selection is unchanged, reusing {export_path}")
+            return export_path
+        size, duration = self.export_fbx(export_path, meshes)
+        self.store_cache(export_path, digest)
+        self.report({"INFO"}, f"Exported {len(meshes)} objects to {export_path} ({size} bytes in {duration:.2f}s)")
+        return export_path
+
+    def check_cache(self, export_path, objects):
+        """
+        Returns the hash of the objects and whether the fbx at export_path
+        is still up to date according to the export manifest
+        """
+        export_settings = bpy.context.scene.export_settings
+        if not export_settings.use_export_cache:
+            return None, False
+        with instrumentation.span("hash"):
+            digest = hash_objects(objects, bpy.context.evaluated_depsgraph_get())
+        key = os.path.relpath(export_path, self._folder_path)
+        up_to_date = (
+            not export_settings.force_export
+            and self._manifest.get(key) == digest
+            and os.path.exists(export_path)
+        )
+        return digest, up_to_date
+
+    def store_cache(self, export_path, digest):
+        """Records the hash of a freshly written fbx in the export manifest"""
+        if digest is not None:
+            self._manifest[os.path.relpath(export_path, self._folder_path)] = digest
+
+    def export_fbx(self, export_path, objects):
+        """
+        Writes only the given objects to export_path by temporarily isolating them in the selection,
+        so every mesh is written exactly once. Returns the bytes written and the wall time
+        """
+        view_layer = bpy.context.view_layer
+        selection = list(bpy.context.selected_objects)
+        active = view_layer.objects.active
+        start = time.perf_counter()
+        try:
+            for obj in selection:
+                obj.select_set(False)
+            for obj in objects:
+                obj.select_set(True)
+            with instrumentation.span("fbx_write"):
+                bpy.ops.export_scene.fbx(
+                    filepath=export_path,
+                    use_selection=True,
+                    **FBX_EXPORT_SETTINGS,
+                )
+        finally:
+            # Restore the users selection
+            for obj in objects:
+                obj.select_set(False)
+            for obj in selection:
+                obj.select_set(True)
+            view_layer.objects.active = active
+        size = os.path.getsize(export_path)
+        instrumentation.count("objects_exported", len(objects))
+        instrumentation.count("bytes_written", size)
+        return size, time.perf_counter() - start
+
+    def start_workers(self, context, folder_path, objects):
+        """
+        Snapshots the scene to a temporary .blend and hands the per object exports
+        to a pool of background Blender processes, one chunk of objects per process
+        """
+        meshes = []
+        self._object_order = []
+        self._exported = {}
+        self._pending_hashes = {}
+        for obj in objects:
+            if obj.type != "MESH":
+                self.report({"WARNING"}, f"{obj.name} is not a mesh object, skipping mesh export.")
+                continue
+            self.check_material(obj)
+            self._object_order.append(obj.name)
+            export_path = os.path.normpath(os.path.join(folder_path, obj.name, f"{obj.name}.fbx"))
+            digest, up_to_date = self.check_cache(export_path, [obj])
+            if up_to_date:
+                instrumentation.count("objects_cached")
+                self.report({"INFO"}, f"{obj.name} is unchanged, reusing {export_path}")
+                self._exported[obj.name] = export_path
+                continue
+            self._pending_hashes[obj.name] = digest
+            meshes.append(obj)
+        if not meshes:
+            return False
+        snapshot = os.path.join(self._pool.work_folder(), "snapshot.blend")
+        with instrumentation.span("snapshot"):
+            bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True, check_existing=False)
+        worker_count = context.scene.export_settings.worker_count or os.cpu_count() or 1
+        worker_count = min(worker_count, len(meshes))
+        for index in range(worker_count):
+            job = {"fbx_settings": FBX_EXPORT_SETTINGS, "objects": []}
+            for obj in meshes[index::worker_count]:
+                obj_folder = folder_path / obj.name
+                obj_folder.mkdir(parents=True, exist_ok=True)
+                export_path = os.path.normpath(os.path.join(obj_folder, f"{obj.name}.fbx"))
+                job["objects"].append({"name": obj.name, "filepath": export_path})
+            self._pool.start(EXPORT_WORKER_SCRIPT, job, blend_file=snapshot)
+        self.report({"INFO"}, f"Exporting {len(meshes)} objects with {worker_count} background processes")
+        return True
+
+    def collect_workers(self):
+        """Reads the results of the export workers and returns the fbx paths in selection order"""
+        exported = self._exported
+        failed = False
+        for process, job, results in self._pool.results():
+            if results is None:
+                self.report({"ERROR"}, f"Export worker failed with exit code {process.returncode}, see {job['log_path']}")
+                failed = True
+                continue
+            for result in results:
+                if result["error"]:
+                    self.report({"ERROR"}, f"Failed to export {result['name']} with error: {result['error']}")
+                    failed = True
+                    continue
+                self.report({"INFO"}, f"Exported {result['name']} to {result['filepath']} ({result['size']} bytes in {result['duration']:.2f}s)")
+                instrumentation.count("objects_exported")
+                instrumentation.count("bytes_written", result["size"])
+                exported[result["name"]] = result["filepath"]
+                self.store_cache(result["filepath"], self._pending_hashes[result["name"]])
+        self._pool.close(keep_logs=failed)
+        return [exported[name] for name in self._object_order if name in exported]
+
     def open_substance_painter(self, export_paths, spp_exe):
         """
-        Combine all mesh filepaths into a single list of arguments through a list comprehension
-        results in [SPP_exe, --mesh, mesh_path, --mesh, mesh_path, etc]
-        which opens substance painter with the selected meshes
+        Opens substance painter with the selected meshes through the session manager,
+        which starts Painter with [SPP_exe, --mesh, mesh_path, --mesh, mesh_path, etc]
+        or hands the meshes to the session already running for the export folder
         """
         try:
-            args = [spp_exe] + [
-                mesh for path in export_paths for mesh in ["--mesh", path]
-            ]
-            subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+            preferences = bpy.context.preferences.addons[__package__].preferences
+            reused = painter_sessions.open(
+                spp_exe,
+                str(self._folder_path),
+                export_paths,
+                preferences.session_handoff,
+                preferences.session_command,
+            )
             self.report(
                 {"INFO"},
-                f"Exporting: {', '.join(export_paths)}",
+                f"Exporting: {', '.join(export_paths)}" + (" to the running Substance Painter" if reused else ""),
             )
         except Exception as e:
             self.report({"ERROR"}, f"Could not open Substance Painter: {str(e)}")
@@ -151,75 +1927,393 @@ class IMPORT_OT_Textures(bpy.types.Operator):
     """Operator to handle importing textures from Substance Painter back to Blender"""
     bl_idname = "import.textures"
     bl_label = "import Textures"
+
+    folder: bpy.props.StringProperty(
+        name="Folder",
+        description="Folder containing the object folders, found from the selection in the export folder if empty",
+        default="",
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+    incremental: bpy.props.BoolProperty(
+        name="Incremental",
+        description="Only update changed maps, regardless of the import settings",
+        default=False,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
     
+    @end_record_on_error
     def execute(self, context):
-        preferences = context.preferences
-        export_folder_path = preferences.addons[__package__].preferences.export_folder
+        instrumentation.begin(context, self, "import")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
+            return {"CANCELLED"}
+        try:
+            if bpy.app.background:
+                while not self.proxies_ready():
+                    time.sleep(0.1)
+            else:
+                self.defer_proxies()
+            for index, item in enumerate(self._queue):
+                self.import_step(context, item)
+                self.check_batch(index + 1)
+        finally:
+            self._prefetcher.close()
+        return self.finish(context)
+
+    @end_record_on_error
+    def invoke(self, context, event):
+        """
+        Imports the textures of one material per timer tick so the UI stays responsive,
+        the import can be cancelled with Esc between two materials
+        """
+        instrumentation.begin(context, self, "import")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
+            return {"CANCELLED"}
+        self._queue_index = 0
+        progress_begin(context, "Importing", len(self._queue))
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    @end_record_on_error
+    def modal(self, context, event):
+        """Assigns the textures of the next queued material on every timer tick"""
+        if event.type == "ESC":
+            self.stop_modal(context)
+            instrumentation.end(context, self)
+            self.report({"WARNING"}, f"Import cancelled, {self._queue_index} of {len(self._queue)} materials were imported")
+            return {"CANCELLED"}
+        if event.type != "TIMER" or not self.proxies_ready():
+            return {"PASS_THROUGH"}
+        if self._queue_index < len(self._queue):
+            self.import_step(context, self._queue[self._queue_index])
+            self._queue_index += 1
+            self.check_batch(self._queue_index)
+            progress_update(context, self._queue_index)
+            return {"PASS_THROUGH"}
+        self.stop_modal(context)
+        return self.finish(context)
+
+    def stop_modal(self, context):
+        """Removes the modal timer, the progress bar, the texture readers and the proxy workers"""
+        context.window_manager.event_timer_remove(self._timer)
+        progress_end(context)
+        self._prefetcher.close()
+        if self._proxy_builder:
+            self._proxy_builder.cancel()
+
+    def finish(self, context):
+        """Removes the copies of the imported images that are no longer used"""
+        if context.scene.texture_settings.purge_superseded_images:
+            with instrumentation.span("purge"):
+                removed = self._image_cache.purge()
+            if removed:
+                self.report({"INFO"}, f"Removed {removed} superseded images")
+        instrumentation.end(context, self)
+        return {"FINISHED"}
+
+    def prepare(self, context):
+        """
+        Queues an (object, material, texture folder) item for every material of the selected meshes,
+        returns False if there is nothing to import
+        """
         objects = context.selected_objects
-        parent_folder = self.folder_iteration(export_folder_path, objects)
+        if not objects:
+            self.report({"INFO"}, "No object selected")
+            return False
+        if self.folder:
+            parent_folder = self.folder
+        else:
+            parent_folder = self.folder_iteration(get_export_root(context), objects)
+        self._incremental = self.incremental or context.scene.texture_settings.incremental_sync
+        self._queue = []
         for obj in objects:
-            if not objects:
-                self.report({"INFO"}, "No object selected")
-                return {"CANCELLED"}
             if obj.type != "MESH":
                 continue
             if parent_folder is None:
                 self.report({"INFO"}, "Folder not found for the selected object, perhaps you forgot to export the object first?")
                 self.report({"INFO"}, "If you already exported the object remeber to include select the object with the same name as the folder in the export folder")
-                return {"CANCELLED"}
+                return False
             object_folder = os.path.join(parent_folder, obj.name)
             os.makedirs(object_folder, exist_ok=True)
             
             if not os.path.exists(object_folder) or not os.path.exists(parent_folder):
                 self.report({"INFO"}, f"Folder does not exist for {obj.name}")
                 continue
-            try:
-                if not obj.data.materials:
-                    mat = bpy.data.materials.new(name=f"{obj.name}_Material")
-                    mat.use_nodes = True
-                    obj.data.materials.append(mat)
-                for mat in obj.data.materials:
-                    # Ensure the material uses nodes
-                    if not mat.use_nodes:
-                        mat.use_nodes = True
-                    # Assign textures to the material
+            if not obj.data.materials:
+                mat = bpy.data.materials.new(name=f"{obj.name}_Material")
+                mat.use_nodes = True
+                obj.data.materials.append(mat)
+            for mat in obj.data.materials:
+                if mat:
+                    self._queue.append((obj, mat, object_folder))
+        # Shared node templates by name, looked up in the blend file the first time they are needed
+        self._templates = {}
+        # Read and check every texture on worker threads while the main thread builds the node trees,
+        # an incremental sync only reads the files of maps that are new
+        try:
+            self._texture_index = TextureIndex(get_texture_rules(context))
+        except Exception as e:
+            self.report({"ERROR"}, f"Failed to read the texture naming rules with error: {str(e)}")
+            return False
+        texture_settings = context.scene.texture_settings
+        # Only the maps the queued materials import are read. A streaming import only reads the headers,
+        # which is enough to plan the batches, and so does an import that loads proxies instead of the files
+        uses_proxies = texture_settings.proxy_resolution != "FULL" and texture_settings.use_proxies
+        self._prefetcher = TexturePrefetcher(
+            texture_settings.import_workers, not texture_settings.streaming_import and not uses_proxies
+        )
+        textures = list(dict.fromkeys(
+            texture
+            for _, mat, object_folder in self._queue
+            for texture in self._texture_index.textures(object_folder, mat.name)
+            if self.use_channel(texture.texture_type, texture_settings)
+        ))
+        if not self._incremental or texture_settings.streaming_import:
+            self._prefetcher.prefetch(filepath for texture in textures for filepath in texture.files)
+        self.start_proxies(context, textures)
+        self._batches = []
+        self._batch_index = 0
+        if texture_settings.streaming_import:
+            with instrumentation.span("plan_batches"):
+                self.plan_batches(texture_settings)
+            self._batch_memory = process_memory()
+        return True
+
+    def plan_batches(self, texture_settings):
+        """
+        Splits the queue into batches whose textures are estimated to fit the memory budget,
+        a material that does not fit on its own gets a batch of its own
+        """
+        budget = texture_settings.memory_budget * 1024 * 1024
+        batch_files = set()
+        batch_bytes = 0
+        for index, (obj, mat, object_folder) in enumerate(self._queue):
+            files = {
+                filepath
+                for texture in self._texture_index.textures(object_folder, mat.name)
+                if self.use_channel(texture.texture_type, texture_settings)
+                for filepath in texture.files
+            }
+            # Textures shared with earlier materials of the batch are already counted
+            new_files = files - batch_files
+            new_bytes = sum(texture_memory(self._prefetcher.get(filepath)) for filepath in new_files)
+            if batch_files and batch_bytes + new_bytes > budget:
+                self._batches.append((index, batch_bytes))
+                batch_files = set()
+                batch_bytes = 0
+                new_files = files
+                new_bytes = sum(texture_memory(self._prefetcher.get(filepath)) for filepath in new_files)
+            batch_files |= new_files
+            batch_bytes += new_bytes
+        self._batches.append((len(self._queue), batch_bytes))
+
+    def check_batch(self, done):
+        """
+        Once the last material of a streaming batch is imported, frees its pixels and reports its memory,
+        the growth of Blender's resident memory is measured from the end of the previous batch
+        """
+        if self._batch_index >= len(self._batches) or self._batches[self._batch_index][0] != done:
+            return
+        estimate = self._batches[self._batch_index][1]
+        self._batch_index += 1
+        used = process_memory()
+        with instrumentation.span("free_batch"):
+            loaded = self._image_cache.free_batch()
+        kept = process_memory()
+        instrumentation.count("batches")
+        megabyte = 1024 * 1024
+        memory = ""
+        if self._batch_memory is not None and used is not None and kept is not None:
+            memory = (
+                f", Blender memory {(used - self._batch_memory) / megabyte:+.0f} MB over the batch"
+                f" and {(kept - self._batch_memory) / megabyte:+.0f} MB once it was freed"
+            )
+        self._batch_memory = kept
+        self.report(
+            {"INFO"},
+            f"Batch {self._batch_index}/{len(self._batches)}: {estimate / megabyte:.0f} MB of textures estimated, "
+            f"{loaded / megabyte:.0f} MB loaded and freed" + memory,
+        )
+
+    def start_proxies(self, context, textures):
+        """Starts writing the missing and outdated proxies of the textures the import loads"""
+        texture_settings = context.scene.texture_settings
+        self._image_cache = ImageCache(use_proxies=texture_settings.use_proxies)
+        self._proxy_builder = None
+        if texture_settings.proxy_resolution == "FULL":
+            return
+        self._proxy_builder = ProxyBuilder(int(texture_settings.proxy_resolution), texture_settings.proxy_workers)
+        # The image cache loads the proxies the builder has ready
+        self._image_cache.proxies = self._proxy_builder.proxies
+        with instrumentation.span("check_proxies"):
+            self._proxy_builder.check(textures, self._prefetcher)
+        if self._proxy_builder.start():
+            self.report({"INFO"}, f"Writing {texture_settings.proxy_resolution} pixel proxies in the background")
+
+    def proxies_ready(self):
+        """Returns False while proxies are written, once they are done reports the ones that failed"""
+        if self._proxy_builder is None:
+            return True
+        if not self._proxy_builder.is_done:
+            return False
+        with instrumentation.span("write_proxies"):
+            errors = self._proxy_builder.finish()
+        for error in errors:
+            self.report({"WARNING"}, error)
+        instrumentation.count("proxies", len(self._proxy_builder.proxies))
+        self._proxy_builder = None
+        return True
+
+    def defer_proxies(self):
+        """
+        Hands the proxies that are still being written to background_proxies, so an import run from
+        a timer or another operator never blocks the UI. Textures without a proxy yet load at full resolution
+        """
+        if self._proxy_builder is None or self._proxy_builder.is_done:
+            self.proxies_ready()
+            return
+        self.report({"INFO"}, "Textures without a proxy are loaded at full resolution until their proxy is written")
+        instrumentation.count("proxies", len(self._proxy_builder.proxies))
+        self._image_cache.pending = self._proxy_builder.pending
+        background_proxies.add(self._proxy_builder)
+        self._proxy_builder = None
+
+    def import_step(self, context, item):
+        """Assigns the textures of a single queued material, the node tree is always built in one step"""
+        obj, mat, object_folder = item
+        try:
+            # Ensure the material uses nodes
+            if not mat.use_nodes:
+                mat.use_nodes = True
+            # Assign textures to the material
+            instrumentation.count("materials")
+            if self._incremental:
+                with instrumentation.span("sync_textures"):
+                    self.sync_textures(
+                        mat, object_folder, context.scene.texture_settings
+                    )
+            elif context.scene.texture_settings.use_node_templates:
+                with instrumentation.span("assign_template"):
+                    self.assign_template(
+                        mat, object_folder, context.scene.texture_settings
+                    )
+            else:
+                with instrumentation.span("assign_textures"):
                     self.assign_textures(
                         mat, object_folder, context.scene.texture_settings
                     )
-            except Exception as e:
-                self.report({"INFO"}, f"Error assigning textures to {obj.name} with error: {str(e)}",)
-                continue
-        return {"FINISHED"}
+        except Exception as e:
+            self.report({"INFO"}, f"Error assigning textures to {obj.name} with error: {str(e)}",)
 
     def folder_iteration(self, base_path, objects):
         '''Method to iterate through the object folder to find the parent folder containing the objects '''
-        path = Path(base_path)
+        names = {obj.name for obj in objects}
         # Find the parent folder containing all of the objects:
-        for f in path.iterdir():
-            for obj in objects:
-                if obj.name == f.name:
-                    return os.path.join(base_path, obj.name)
-                pass
+        try:
+            with os.scandir(base_path) as entries:
+                for entry in entries:
+                    if entry.name in names:
+                        return os.path.join(base_path, entry.name)
+        except OSError:
+            return None
+
+    def sync_textures(self, material, textures_folder, texture_settings):
+        """
+        Method to update the textures of a material in place, only images whose file changed
+        are reloaded, nodes are only added for new maps and removed for maps whose file disappeared
+        from disk. Image nodes of other files in the folder, such as maps wired in by hand, are kept
+        """
+        nodes = material.node_tree.nodes
+        folder_key = image_file_key(textures_folder)
+        # Image nodes of the material that use a texture from the object folder
+        existing = {}
+        for node in nodes:
+            if node.type == "TEX_IMAGE" and node.image and node.image.filepath:
+                key = image_file_key(image_source(node.image))
+                if os.path.dirname(key) == folder_key:
+                    existing.setdefault(key, []).append(node)
+        reloaded = []
+        new_textures = []
+        for texture in self._texture_index.textures(textures_folder, material.name):
+            if not self.use_channel(texture.texture_type, texture_settings):
+                continue
+            image_nodes = existing.pop(image_file_key(texture.filepath), None)
+            if image_nodes is None:
+                new_textures.append(texture)
+                continue
+            image = image_nodes[0].image
+            stamp = texture_stamp(texture)
+            if image.get("b2sp_stamp") != stamp:
+                instrumentation.count("images_reloaded")
+                with instrumentation.span("load_images"):
+                    if not self._image_cache.apply_proxy(image, texture.filepath):
+                        image.reload()
+                image["b2sp_stamp"] = stamp
+                reloaded.append(texture.filename)
+        # Only maps whose file is gone are removed, the index also knows the UDIM sets by their <UDIM> path
+        present = {image_file_key(entry.filepath) for entry in self._texture_index.entries(textures_folder)}
+        existing = {
+            key: image_nodes for key, image_nodes in existing.items()
+            if key not in present and not os.path.exists(key)
+        }
+        # A template instance has one input per map, so a different set of maps needs another template
+        if texture_settings.use_node_templates and (new_textures or existing or not self.has_template(nodes)):
+            self.assign_template(material, textures_folder, texture_settings, keep_work_space=True)
+            return
+        # Remove the nodes of maps whose file disappeared, with the helper nodes they fed
+        removed = 0
+        for image_nodes in existing.values():
+            for image_node in image_nodes:
+                helpers = [
+                    link.to_node for link in image_node.outputs["Color"].links
+                    if link.to_node.type in {"NORMAL_MAP", "BUMP", "SEPARATE_COLOR"}
+                ]
+                nodes.remove(image_node)
+                removed += 1
+                for helper in helpers:
+                    if not any(socket.is_linked for socket in helper.inputs):
+                        nodes.remove(helper)
+        # Bypass the ambient occlusion multiply if its occlusion map is gone
+        for node in list(nodes):
+            if node.type == "MIX" and node.label == "Ambient Occlusion":
+                if not get_socket(node.inputs, "B_Color").is_linked:
+                    self.bypass_ambient_occlusion(node, material.node_tree.links)
+        if new_textures:
+            self.assign_textures(material, textures_folder, texture_settings, new_textures)
+        self.report(
+            {"INFO"},
+            f"{material.name}: {len(reloaded)} textures reloaded {str(reloaded)}, {len(new_textures)} added, {removed} removed",
+        )
 
-    def assign_textures(self, material, textures_folder, texture_settings):
+    def assign_textures(self, material, textures_folder, texture_settings, textures=None):
         """
         Method to assign material and textures to the selected material,
         Takes the material, the objects texture folder and
-        the users texture settings as args
+        the users texture settings as args. If textures is given only those
+        index entries are added to the material and nothing is removed
         """
         node_tree = material.node_tree
         nodes = node_tree.nodes
         links = node_tree.links
-        file_types = (".png", ".jpg", ".jpeg")
         node_x_displacement = 400
         # Used to reset position
         node_y_position = 400
         # Used to show what textures where assigned
         textures_assigned = []
+        # Only new textures are added, link them but keep the rest of the material
+        add_only = textures is not None
+        link_textures = texture_settings.clear_work_space or add_only
         # Remove previous nodes to clear the workspace if the user wants it
-        if texture_settings.clear_work_space:
-            for node in nodes:
+        if texture_settings.clear_work_space and not add_only:
+            for node in list(nodes):
                 nodes.remove(node)
+        elif add_only and len(nodes):
+            # Place the new nodes below the existing ones
+            node_y_position = min(node.location.y for node in nodes) - 400
+        node_count = len(nodes)
         # check if output and bsdf_principled nodes exist
         output_node = None
         principled_node = None
@@ -235,152 +2329,527 @@ class IMPORT_OT_Textures(bpy.types.Operator):
         if not principled_node:
             principled_node = nodes.new(type="ShaderNodeBsdfPrincipled")
             principled_node.location = (0, 0)
-        links.new(principled_node.outputs["BSDF"], output_node.inputs["Surface"])
-        # Normal and displacement rereferences
-        normal_node_ref = None
-        displace_node_ref = None
-        # Iterates through the texture folder of an object and assigns textures to the material:
-        for filename in os.listdir(textures_folder):
-            if filename.lower().endswith(file_types):
-                if material.name not in filename:
-                    continue
-                texture_type = self.get_texture_type(filename)
-                filepath = os.path.join(textures_folder, filename)
-                match texture_type:
-                    case "Base Color":
-                        image_node = self.create_image_node(nodes,node_y_position,filepath)
-                        if texture_settings.clear_work_space:
-                            links.new(
-                                image_node.outputs["Color"],
-                                principled_node.inputs["Base Color"],
-                            )
-                        node_y_position -= 400
-                        textures_assigned.append(filename)
-                    case  "Roughness":
-                        image_node = self.create_image_node(nodes,node_y_position,filepath)
-                        if texture_settings.clear_work_space:
-                            links.new(image_node.outputs["Color"], principled_node.inputs["Roughness"])
-                        image_node.image.colorspace_settings.name = "Non-Color"
-                        node_y_position -= 400
-                        textures_assigned.append(filename)
-                    case "Displacement" if texture_settings.use_bump_map:
-                        image_node = self.create_image_node(nodes,node_y_position,filepath)
-                        image_node.image.colorspace_settings.name = "Non-Color"
-                        if texture_settings.use_normal_map:
-                            normal_node_ref = image_node
-                        else:
-                            bump_node = nodes.new(type="ShaderNodeBump")
-                            bump_node.location = (image_node.location.x +node_x_displacement,node_y_position)
-                            
-                            links.new(image_node.outputs["Color"],bump_node.inputs["Height"])
-                            if texture_settings.clear_work_space:
-                                links.new(bump_node.outputs["Normal"],principled_node.inputs["Normal"])   
-                        node_y_position -= 400
-                        textures_assigned.append(filename)
-                    case "Normal" if texture_settings.use_normal_map:
-                        image_node = self.create_image_node(nodes,node_y_position,filepath)
-                        image_node.image.colorspace_settings.name = "Non-Color"
-                        if texture_settings.use_bump_map:
-                            displace_node_ref = image_node
-                        else:
-                            normal_map_node = nodes.new(type="ShaderNodeNormalMap")
-                            normal_map_node.location = (image_node.location.x +node_x_displacement,node_y_position)
-                            links.new(image_node.outputs["Color"],normal_map_node.inputs["Color"])
-                            if texture_settings.clear_work_space:
-                                links.new(normal_map_node.outputs["Normal"],principled_node.inputs["Normal"])   
-                        node_y_position -= 400
-                        textures_assigned.append(filename)
-                    case "Metallic":
-                        image_node = self.create_image_node(nodes,node_y_position,filepath)
-                        image_node.image.colorspace_settings.name = "Non-Color"
-                        if texture_settings.clear_work_space:
-                            links.new(
-                                image_node.outputs["Color"], principled_node.inputs["Metallic"]
-                            )
-                        node_y_position -= 400
-                        textures_assigned.append(filename)                   
-        if texture_settings.use_bump_map and texture_settings.use_normal_map:
-            bump_normal_node = nodes.new(type="ShaderNodeBump")
-            bump_normal_node.location = ( displace_node_ref.location.x + node_x_displacement,(displace_node_ref.location.y-normal_node_ref.location.y)/2.0)
-            links.new(displace_node_ref.outputs["Color"], bump_normal_node.inputs["Normal"])
-            links.new(normal_node_ref.outputs["Color"], bump_normal_node.inputs["Height"])
-            if texture_settings.clear_work_space:
-                links.new(bump_normal_node.outputs["Normal"], principled_node.inputs["Normal"])
+        self.link_input(links, principled_node.outputs["BSDF"], output_node.inputs["Surface"], add_only)
+        # Normal, displacement and ambient occlusion outputs, combined once all textures are added
+        texture_refs = {}
+        if not add_only:
+            textures = self._texture_index.textures(textures_folder, material.name)
+        # Iterates through the textures of the material in the object folder and assigns them to the material:
+        for texture in self.usable_textures(textures, texture_settings):
+            image_node = self.create_image_node(nodes,node_y_position,texture)
+            image_node.image.colorspace_settings.name = TEXTURE_CHANNELS[texture.texture_type][0]
+            self.link_texture(
+                nodes, links, principled_node, texture.texture_type, image_node.outputs["Color"],
+                (image_node.location.x + node_x_displacement, node_y_position),
+                texture_settings, link_textures, texture_refs, keep_links=add_only,
+            )
+            node_y_position -= 400
+            textures_assigned.append(texture.filename)
+        self.link_texture_refs(nodes, links, principled_node, texture_settings, link_textures, texture_refs, keep_links=add_only)
+        instrumentation.count("nodes_created", len(nodes) - node_count)
         self.report({"INFO"},f"{str(len(textures_assigned))} textures were imported {str(textures_assigned)}",)
-    
-    def get_texture_type(self, filename):
-        """Returns the texture by type"""
-        if "diffuse" in filename.lower() or "basecolor" in filename.lower():
-            return "Base Color"
-        elif "roughness" in filename.lower():
-            return "Roughness"
-        elif "normal" in filename.lower():
-            return "Normal"
-        elif "displacement" in filename.lower():
-            return "Displacement"
-        elif "metallic" in filename.lower():
-            return "Metallic"
+
+    def assign_template(self, material, textures_folder, texture_settings, keep_work_space=False):
+        """
+        Gives the material an instance of the shared node template for its set of maps and only
+        its own image nodes. The nodes of earlier imports are replaced, the rest of the material
+        is kept unless the workspace is cleared. An incremental sync never clears it and only
+        replaces the image nodes that fed the template
+        """
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+        textures = list(self.usable_textures(self._texture_index.textures(textures_folder, material.name), texture_settings))
+        if texture_settings.clear_work_space and not keep_work_space:
+            for node in list(nodes):
+                nodes.remove(node)
         else:
-            return None
-          
-    def create_image_node(self,nodes,node_y_position,filepath):
+            folder_key = image_file_key(textures_folder)
+            # Collected first, removing the template instance drops the links the image nodes are found by
+            replaced = [
+                node for node in nodes
+                if self.is_template_node(node) or (
+                    node.type == "TEX_IMAGE" and node.image and node.image.filepath
+                    and os.path.dirname(image_file_key(image_source(node.image))) == folder_key
+                    and (not keep_work_space or any(self.is_template_node(link.to_node) for link in node.outputs["Color"].links))
+                )
+            ]
+            for node in replaced:
+                nodes.remove(node)
+        node_count = len(nodes)
+        output_node = next((node for node in nodes if node.type == "OUTPUT_MATERIAL"), None)
+        if not output_node:
+            output_node = nodes.new(type="ShaderNodeOutputMaterial")
+            output_node.location = (400, 0)
+        channels = tuple(channel for channel in TEXTURE_CHANNELS if any(texture.texture_type == channel for texture in textures))
+        group_node = nodes.new(type="ShaderNodeGroup")
+        group_node.node_tree = self.get_node_template(channels, texture_settings)
+        group_node.location = (0, 0)
+        links.new(group_node.outputs["BSDF"], output_node.inputs["Surface"])
+        node_y_position = 400
+        for texture in textures:
+            image_node = self.create_image_node(nodes, node_y_position, texture)
+            image_node.image.colorspace_settings.name = TEXTURE_CHANNELS[texture.texture_type][0]
+            links.new(image_node.outputs["Color"], group_node.inputs[texture.texture_type])
+            node_y_position -= 400
+        instrumentation.count("nodes_created", len(nodes) - node_count)
+        self.report(
+            {"INFO"},
+            f"{len(textures)} textures were imported {str([texture.filename for texture in textures])} with {group_node.node_tree.name}",
+        )
+
+    def get_node_template(self, channels, texture_settings):
+        """Returns the shared node template for a set of maps, it is only built if the blend file has none yet"""
+        name = " ".join((
+            "B2SP PBR",
+            "-".join(TEMPLATE_CHANNEL_CODES[channel] for channel in channels) or "Empty",
+            ("N" if texture_settings.use_normal_map else "") + ("B" if texture_settings.use_bump_map else ""),
+        )).strip()
+        template = self._templates.get(name)
+        if template is None:
+            template = next((group for group in bpy.data.node_groups if group.get("b2sp_template") == name), None)
+            if template is None:
+                template = self.build_node_template(name, channels, texture_settings)
+            self._templates[name] = template
+        return template
+
+    def build_node_template(self, name, channels, texture_settings):
+        """Builds a node group with a color input per map, wired to a Principled BSDF like a regular import"""
+        template = bpy.data.node_groups.new(name, "ShaderNodeTree")
+        template["b2sp_template"] = name
+        for channel in channels:
+            template.interface.new_socket(name=channel, in_out="INPUT", socket_type="NodeSocketColor")
+        template.interface.new_socket(name="BSDF", in_out="OUTPUT", socket_type="NodeSocketShader")
+        nodes = template.nodes
+        links = template.links
+        group_input = nodes.new(type="NodeGroupInput")
+        group_input.location = (-800, 0)
+        group_output = nodes.new(type="NodeGroupOutput")
+        group_output.location = (400, 0)
+        principled_node = nodes.new(type="ShaderNodeBsdfPrincipled")
+        principled_node.location = (0, 0)
+        links.new(principled_node.outputs["BSDF"], group_output.inputs["BSDF"])
+        texture_refs = {}
+        for index, channel in enumerate(channels):
+            self.link_texture(
+                nodes, links, principled_node, channel, group_input.outputs[channel],
+                (-400, -200 * index), texture_settings, True, texture_refs,
+            )
+        self.link_texture_refs(nodes, links, principled_node, texture_settings, True, texture_refs)
+        instrumentation.count("templates_created")
+        return template
+
+    def is_template_node(self, node):
+        """Returns whether the node is an instance of a shared node template"""
+        return node.type == "GROUP" and node.node_tree is not None and "b2sp_template" in node.node_tree
+
+    def has_template(self, nodes):
+        """Returns whether the material uses a shared node template"""
+        return any(self.is_template_node(node) for node in nodes)
+
+    def usable_textures(self, textures, texture_settings):
+        """Yields the textures of the channels the user imports whose files could be read"""
+        for texture in textures:
+            if not self.use_channel(texture.texture_type, texture_settings):
+                continue
+            with instrumentation.span("read_textures"):
+                errors = [info.error for info in map(self._prefetcher.get, texture.files) if info.error]
+            if errors:
+                self.report({"WARNING"}, f"Skipping {texture.filename}: {errors[0]}")
+                continue
+            yield texture
+
+    def link_texture(self, nodes, links, principled_node, texture_type, source, location, texture_settings, link_textures, texture_refs, keep_links=False):
+        """
+        Connects the color output of a texture to the Principled BSDF through the helper nodes
+        its channel needs, placed at location. Normal, height and ambient occlusion outputs are kept
+        in texture_refs for link_texture_refs. With keep_links inputs that are already linked are left as they are
+        """
+        match texture_type:
+            case "Displacement" | "Height":
+                if texture_settings.use_normal_map:
+                    texture_refs["height"] = source
+                else:
+                    bump_node = nodes.new(type="ShaderNodeBump")
+                    bump_node.location = location
+                    links.new(source,bump_node.inputs["Height"])
+                    if link_textures:
+                        self.link_input(links, bump_node.outputs["Normal"], principled_node.inputs["Normal"], keep_links)
+            case "Normal":
+                if texture_settings.use_bump_map:
+                    texture_refs["normal"] = source
+                else:
+                    normal_map_node = nodes.new(type="ShaderNodeNormalMap")
+                    normal_map_node.location = location
+                    links.new(source,normal_map_node.inputs["Color"])
+                    if link_textures:
+                        self.link_input(links, normal_map_node.outputs["Normal"], principled_node.inputs["Normal"], keep_links)
+            case "Ambient Occlusion":
+                texture_refs["ambient_occlusion"] = source
+            case "ORM":
+                # Packed map, split into ambient occlusion, roughness and metallic
+                separate_node = nodes.new(type="ShaderNodeSeparateColor")
+                separate_node.location = location
+                links.new(source, separate_node.inputs["Color"])
+                texture_refs["ambient_occlusion"] = separate_node.outputs["Red"]
+                if link_textures:
+                    self.link_input(links, separate_node.outputs["Green"], principled_node.inputs["Roughness"], keep_links)
+                    self.link_input(links, separate_node.outputs["Blue"], principled_node.inputs["Metallic"], keep_links)
+            case _:
+                if link_textures:
+                    linked = self.link_input(links, source, principled_node.inputs[TEXTURE_CHANNELS[texture_type][1]], keep_links)
+                    if linked and texture_type == "Emission":
+                        principled_node.inputs["Emission Strength"].default_value = 1.0
+
+    def link_input(self, links, output, socket, keep_links):
+        """
+        Links output to the socket and returns whether it did, with keep_links only if the socket is not
+        linked yet. A socket fed by the ambient occlusion multiply is linked through the color it darkens
+        """
+        if keep_links and socket.is_linked:
+            mix_node = socket.links[0].from_node
+            if mix_node.type != "MIX" or mix_node.label != "Ambient Occlusion":
+                return False
+            socket = get_socket(mix_node.inputs, "A_Color")
+            if socket.is_linked:
+                return False
+        links.new(output, socket)
+        return True
+
+    def link_texture_refs(self, nodes, links, principled_node, texture_settings, link_textures, texture_refs, keep_links=False):
+        """
+        Feeds the normal map through a Normal Map node into the bump node of the height map, or links
+        whichever of the two exists on its own, and multiplies the ambient occlusion. With keep_links
+        an existing ambient occlusion multiply is reused
+        """
+        normal, height = texture_refs.get("normal"), texture_refs.get("height")
+        # Either map also works on its own when the other one is missing
+        normal_output = None
+        if normal:
+            normal_map_node = nodes.new(type="ShaderNodeNormalMap")
+            normal_map_node.location = (normal.node.location.x + 400, normal.node.location.y)
+            links.new(normal, normal_map_node.inputs["Color"])
+            normal_output = normal_map_node.outputs["Normal"]
+        if height:
+            bump_node = nodes.new(type="ShaderNodeBump")
+            bump_node.location = (height.node.location.x + 700, height.node.location.y)
+            links.new(height, bump_node.inputs["Height"])
+            if normal_output:
+                links.new(normal_output, bump_node.inputs["Normal"])
+            normal_output = bump_node.outputs["Normal"]
+        if normal_output and link_textures:
+            self.link_input(links, normal_output, principled_node.inputs["Normal"], keep_links)
+        if texture_refs.get("ambient_occlusion") and link_textures:
+            base_color = principled_node.inputs["Base Color"]
+            mix_node = base_color.links[0].from_node if base_color.is_linked else None
+            if keep_links and mix_node and mix_node.type == "MIX" and mix_node.label == "Ambient Occlusion":
+                if not get_socket(mix_node.inputs, "B_Color").is_linked:
+                    links.new(texture_refs["ambient_occlusion"], get_socket(mix_node.inputs, "B_Color"))
+            else:
+                self.multiply_ambient_occlusion(nodes, links, principled_node, texture_refs["ambient_occlusion"])
+
+    def use_channel(self, texture_type, texture_settings):
+        """Returns whether textures of the channel are imported with the users texture settings"""
+        if texture_type in {"Displacement", "Height"}:
+            return texture_settings.use_bump_map
+        if texture_type == "Normal":
+            return texture_settings.use_normal_map
+        return True
+
+    def multiply_ambient_occlusion(self, nodes, links, principled_node, ambient_occlusion):
+        """The Principled BSDF has no occlusion input, so the occlusion is multiplied onto the base color"""
+        base_color = principled_node.inputs["Base Color"]
+        mix_node = nodes.new(type="ShaderNodeMix")
+        mix_node.data_type = "RGBA"
+        mix_node.blend_type = "MULTIPLY"
+        mix_node.label = "Ambient Occlusion"
+        mix_node.location = (principled_node.location.x - 300, principled_node.location.y + 300)
+        get_socket(mix_node.inputs, "Factor_Float").default_value = 1.0
+        color_input = get_socket(mix_node.inputs, "A_Color")
+        if base_color.is_linked:
+            links.new(base_color.links[0].from_socket, color_input)
+        else:
+            color_input.default_value = base_color.default_value
+        links.new(ambient_occlusion, get_socket(mix_node.inputs, "B_Color"))
+        links.new(get_socket(mix_node.outputs, "Result_Color"), base_color)
+
+    def bypass_ambient_occlusion(self, mix_node, links):
+        """Removes an ambient occlusion multiply and reconnects the color it darkened"""
+        color_input = get_socket(mix_node.inputs, "A_Color")
+        source = color_input.links[0].from_socket if color_input.is_linked else None
+        targets = [link.to_socket for link in get_socket(mix_node.outputs, "Result_Color").links]
+        mix_node.id_data.nodes.remove(mix_node)
+        if source:
+            for target in targets:
+                links.new(source, target)
+    
+    def create_image_node(self,nodes,node_y_position,texture):
         '''Creates an image node and loads a texture to it'''
         image_node = nodes.new(type="ShaderNodeTexImage")
         image_node.location = (-800, node_y_position)
-        image_node.image = bpy.data.images.load(filepath)
+        image_node.image = self._image_cache.load(texture)
         return image_node
     
 # --------------------------------------------------------------------------------
 # UTILITY OPERATORS
 # --------------------------------------------------------------------------------
 
+class BAKE_OT_SubstancePainterBatch(bpy.types.Operator):
+    """
+    Exports the selection and textures every mesh through the batch texturing command
+    instead of the Substance Painter UI, the textures are imported as soon as a job finishes
+    """
+    bl_idname = "bake.substance_painter"
+    bl_label = "Batch Texture in Substance Painter"
+
+    @end_record_on_error
+    def execute(self, context):
+        instrumentation.begin(context, self, "bake")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
+            return {"CANCELLED"}
+        while not self._queue.is_done:
+            self.import_finished(context, self._queue.poll())
+            time.sleep(0.1)
+        return self.finish(context)
+
+    @end_record_on_error
+    def invoke(self, context, event):
+        instrumentation.begin(context, self, "bake")
+        if not self.prepare(context):
+            instrumentation.end(context, self)
+            return {"CANCELLED"}
+        progress_begin(context, "Texturing", self._total)
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.5, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    @end_record_on_error
+    def modal(self, context, event):
+        """Polls the jobs and imports the textures of the finished ones"""
+        if event.type == "ESC":
+            self._queue.cancel()
+            self.stop_modal(context)
+            instrumentation.end(context, self)
+            self.report({"WARNING"}, f"Batch texturing cancelled, {self._textured} of {self._total} objects were textured")
+            return {"CANCELLED"}
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+        self.import_finished(context, self._queue.poll())
+        progress_update(context, self._done)
+        if not self._queue.is_done:
+            return {"PASS_THROUGH"}
+        self.stop_modal(context)
+        return self.finish(context)
+
+    def stop_modal(self, context):
+        """Removes the modal timer and the progress bar"""
+        context.window_manager.event_timer_remove(self._timer)
+        progress_end(context)
+
+    def prepare(self, context):
+        """Exports the selected meshes and queues a texturing job for each of them"""
+        preferences = context.preferences.addons[__package__].preferences
+        if not preferences.bake_command:
+            self.report({"ERROR"}, "Set a batch texturing command in the addon preferences first")
+            return False
+        if context.scene.export_settings.export_mode == "COMBINED":
+            self.report({"ERROR"}, "Batch texturing needs one FBX per object, change the export mode")
+            return False
+        objects = [obj for obj in context.selected_objects if obj.type == "MESH"]
+        if not objects:
+            self.report({"INFO"}, "No object selected")
+            return False
+        self._folder_path = get_export_folder(context)
+        if self._folder_path is None:
+            self.report({"INFO"}, "No active object, the export folder is named after it")
+            return False
+        try:
+            with instrumentation.span("export"):
+                result = bpy.ops.export.substance_painter(launch_painter=False)
+        except RuntimeError as e:
+            self.report({"ERROR"}, f"Failed to export objects with error: {str(e)}")
+            return False
+        # Without a finished export the FBX files on disk may be left from an earlier run
+        if "FINISHED" not in result:
+            self.report({"ERROR"}, f"Export returned {result}, nothing was textured")
+            return False
+        self._queue = PainterBakeQueue(
+            preferences.bake_command,
+            preferences.bake_preset,
+            preferences.spp_exe,
+            preferences.bake_jobs,
+            preferences.bake_timeout,
+        )
+        self._total = 0
+        for obj in objects:
+            mesh_path = self._folder_path / obj.name / f"{obj.name}.fbx"
+            if not mesh_path.exists():
+                self.report({"WARNING"}, f"No exported FBX found for {obj.name}, skipping it")
+                continue
+            texture_sets = [mat.name for mat in obj.data.materials if mat]
+            self._queue.submit(obj.name, str(mesh_path), str(mesh_path.parent), texture_sets)
+            self._total += 1
+        self._done = 0
+        self._textured = 0
+        return self._total > 0
+
+    def import_finished(self, context, jobs):
+        """Reports the finished jobs and imports the textures of the successful ones"""
+        for job in jobs:
+            self._done += 1
+            if job["error"] or job["timed_out"] or job["returncode"] != 0:
+                reason = job["error"] or ("timed out" if job["timed_out"] else f"exit code {job['returncode']}")
+                self.report({"ERROR"}, f"Batch texturing of {job['name']} failed ({reason}), see {job['log_path']}")
+                instrumentation.count("jobs_failed")
+                continue
+            instrumentation.count("job_seconds", round(job["duration"], 3))
+            obj = context.scene.objects.get(job["name"])
+            if obj is None:
+                continue
+            try:
+                with context.temp_override(selected_objects=[obj]), instrumentation.span("import"):
+                    getattr(bpy.ops, "import").textures(folder=str(self._folder_path))
+            except RuntimeError as e:
+                self.report({"ERROR"}, f"Failed to import the textures of {job['name']} with error: {str(e)}")
+                continue
+            self._textured += 1
+            self.report({"INFO"}, f"Textured {job['name']} in {job['duration']:.1f}s")
+
+    def finish(self, context):
+        instrumentation.count("objects_textured", self._textured)
+        instrumentation.end(context, self)
+        self.report({"INFO"}, f"Batch texturing done, {self._textured} of {self._total} objects were textured")
+        return {"FINISHED"}
+
 class REMOVE_OT_UNUSED_TEXTURES(bpy.types.Operator):
-    """Removes any unused image texture nodes in the entire scene or for the selected material only"""
+    """
+    Removes the image texture nodes that do not reach the material output, with the Normal Map, Bump
+    and Separate Color nodes they feed, in the entire scene or for the selected material only
+    """
     bl_idname = "remove.unusedtextures"
     bl_label = "Remove Unused Textures"
 
+    @end_record_on_error
     def execute(self, context):
         obj = context.active_object
-        remove_all = context.scene.texture_settings.remove_all_unused
+        texture_settings = context.scene.texture_settings
+        remove_all = texture_settings.remove_all_unused
+        instrumentation.begin(context, self, "remove_unused")
         # Remove all unused texture nodes on all materials in the scene
         if remove_all:
-            for material in bpy.data.materials:
-                if material.use_nodes:
-                    self.remove_nodes(material)
-                    self.realign_nodes(material.node_tree.nodes)
+            materials = [material for material in bpy.data.materials if material.use_nodes and not material.library]
         # Remove unused texture nodes from the active object's material only
         else:
-            if not obj or not obj.data.materials:
+            if not obj or obj.type != "MESH" or not obj.data.materials:
+                instrumentation.end(context, self)
                 self.report(
                     {"WARNING"}, "No object selected or object has no materials."
                 )
                 return {"CANCELLED"}
             material = obj.active_material
-            if material and material.use_nodes:
-                self.remove_nodes(material)
-                self.realign_nodes(material.node_tree.nodes)
-
+            materials = [material] if material and material.use_nodes else []
+        removed_nodes = 0
+        images = set()
+        for material in materials:
+            removed_nodes += self.remove_nodes(material, images)
+        removed_images, freed = 0, 0
+        if texture_settings.purge_unused_images:
+            if remove_all:
+                images.update(image.name for image in bpy.data.images if not image.users)
+            with instrumentation.span("purge"):
+                removed_images, freed = purge_images(
+                    [bpy.data.images[name] for name in images if name in bpy.data.images]
+                )
+        instrumentation.count("nodes_removed", removed_nodes)
+        instrumentation.count("images_purged", removed_images)
+        instrumentation.count("bytes_freed", freed)
+        instrumentation.end(context, self)
+        self.report(
+            {"INFO"},
+            f"Removed {removed_nodes} nodes from {len(materials)} materials and {removed_images} images, freeing {freed / (1024 * 1024):.1f} MB",
+        )
         return {"FINISHED"}
 
-    def remove_nodes(self, material):
-        """Removes unused ShaderNodeTexImage nodes in a material"""
+    def remove_nodes(self, material, images):
+        """
+        Removes the unused texture nodes of a material in one pass, the nodes are collected first
+        and removed afterwards. Adds the names of their images to images and returns the number removed
+        """
+        node_tree = material.node_tree
         try:
-            mat_nodes = material.node_tree.nodes
-            for node in mat_nodes:
-                if isinstance(node, bpy.types.ShaderNodeTexImage):
-                    if len(node.outputs[0].links) == 0:
-                        mat_nodes.remove(node)
+            with instrumentation.span("find_unused"):
+                unused = find_unused_texture_nodes(node_tree)
+            if not unused:
+                return 0
+            with instrumentation.span("remove_nodes"):
+                nodes = node_tree.nodes
+                for name in unused:
+                    node = nodes[name]
+                    if node.type == "TEX_IMAGE" and node.image:
+                        images.add(node.image.name)
+                    nodes.remove(node)
+            with instrumentation.span("realign"):
+                self.realign_nodes(nodes)
         except Exception as e:
-            self.report({"INFO"}, f"Failed to remove nodes with error: {e}")
+            self.report({"INFO"}, f"Failed to remove nodes from {material.name} with error: {e}")
+            return 0
+        return len(unused)
 
     def realign_nodes(self, nodes):
-        """Realigns the remaining texture nodes for better structure"""
-        y_offset = 0
+        """
+        Realigns the remaining texture nodes into a column without the gaps left by the removed ones,
+        the helper nodes next to them move along and the rest of the tree is left where it is
+        """
+        image_nodes = sorted((node for node in nodes if node.type == "TEX_IMAGE"), key=lambda node: -node.location.y)
+        if not image_nodes:
+            return
+        y_offset = image_nodes[0].location.y
         node_spacing = 300
-        for node in nodes:
-            node.location.y = y_offset
+        moved = set()
+        for node in image_nodes:
+            offset = y_offset - node.location.y
+            if offset:
+                node.location.y += offset
+                for link in node.outputs[0].links:
+                    helper = link.to_node
+                    if helper.type in TEXTURE_HELPER_NODE_TYPES and helper.name not in moved:
+                        helper.location.y += offset
+                        moved.add(helper.name)
             y_offset -= node_spacing
 
+class CLEAR_OT_ExportCache(bpy.types.Operator):
+    """Invalidates the export cache so the active object's folder is fully exported again"""
+    bl_idname = "clear.export_cache"
+    bl_label = "Invalidate Export Cache"
+
+    def execute(self, context):
+        folder_path = get_export_folder(context)
+        if folder_path is None:
+            self.report({"WARNING"}, "No active object selected.")
+            return {"CANCELLED"}
+        manifest_path = folder_path / EXPORT_MANIFEST_NAME
+        try:
+            if manifest_path.exists():
+                manifest_path.unlink()
+            self.report({"INFO"}, f"Invalidated export cache for {folder_path}")
+        except Exception as e:
+            self.report({"ERROR"}, f"Failed to invalidate export cache, the error: {str(e)}")
+            return {"CANCELLED"}
+        return {"FINISHED"}
+
+class STOP_OT_PainterSession(bpy.types.Operator):
+    """Stops a Substance Painter session started by the addon, or forgets it if it already exited"""
+    bl_idname = "stop.painter_session"
+    bl_label = "Stop Substance Painter Session"
+
+    folder: bpy.props.StringProperty(name="Folder", default="", options={"HIDDEN", "SKIP_SAVE"})
+    pid: bpy.props.IntProperty(name="Process ID", default=0, options={"HIDDEN", "SKIP_SAVE"})
+
+    def execute(self, context):
+        painter_sessions.stop(self.folder, self.pid)
+        return {"FINISHED"}
+
 class OPEN_OT_FBXFolder(bpy.types.Operator):
     """Opens the FBX Export Folder"""
     bl_idname = "open.fbx_folder"
@@ -421,9 +2890,44 @@ class VIEW3D_PT_QuickExporter_ExportImport(bpy.types.Panel):
             text="Import from Substance Painter",
             icon="IMPORT",
         )
+        col.operator(
+            BAKE_OT_SubstancePainterBatch.bl_idname,
+            text="Batch texture in Substance Painter",
+            icon="TEXTURE",
+        )
         col.operator(
             OPEN_OT_FBXFolder.bl_idname, text="Open Object folder", icon="FILE_FOLDER"
         )
+        progress = context.window_manager.b2sp_progress
+        if progress.is_running:
+            col = layout.column(align=True)
+            col.progress(
+                factor=progress.done / max(progress.total, 1),
+                type="BAR",
+                text=f"{progress.label} {progress.done}/{progress.total}",
+            )
+            col.label(text="Press Esc to cancel")
+
+class VIEW3D_PT_QuickExporter_ExportSettings(bpy.types.Panel):
+    """Export Settings Panel for the addon"""
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "B2SP Linker"
+    bl_label = "Export Settings"
+    bl_icon = "SETTINGS"
+
+    def draw(self, context):
+        layout = self.layout
+        export_settings = context.scene.export_settings
+        col = layout.column()
+        col.prop(export_settings, "export_mode", text="Mode")
+        if export_settings.export_mode == "PARALLEL":
+            col.prop(export_settings, "worker_count")
+        col.prop(export_settings, "use_export_cache")
+        row = col.row()
+        row.enabled = export_settings.use_export_cache
+        row.prop(export_settings, "force_export")
+        col.operator(CLEAR_OT_ExportCache.bl_idname, text="Invalidate export cache", icon="TRASH")
 
 class VIEW3D_PT_QuickExporter_ImportSettings(bpy.types.Panel):
     """Texture Import Settings Panel for the addon"""
@@ -437,9 +2941,76 @@ class VIEW3D_PT_QuickExporter_ImportSettings(bpy.types.Panel):
         layout = self.layout
         texture_settings = context.scene.texture_settings
         col = layout.column()
+        col.prop(texture_settings, "texture_preset", text="Preset")
         col.prop(texture_settings, "use_normal_map", text="Normal Map")
         col.prop(texture_settings, "use_bump_map", text="Bump Map")
         col.prop(texture_settings, "clear_work_space", text="Clear Workspace")
+        col.prop(texture_settings, "use_node_templates", text="Shared Node Templates")
+        col.prop(texture_settings, "incremental_sync", text="Only Update Changed Maps")
+        col.prop(texture_settings, "live_link", text="Live Link")
+        sub = col.column()
+        sub.enabled = texture_settings.live_link
+        sub.prop(texture_settings, "live_link_interval")
+        sub.prop(texture_settings, "live_link_settle_time")
+        col.prop(texture_settings, "import_workers", text="Import Workers")
+        col.prop(texture_settings, "purge_superseded_images", text="Purge Superseded Images")
+        col.prop(texture_settings, "streaming_import", text="Streaming Import")
+        sub = col.column()
+        sub.enabled = texture_settings.streaming_import
+        sub.prop(texture_settings, "memory_budget")
+        col.prop(texture_settings, "proxy_resolution", text="Proxies")
+        sub = col.column()
+        sub.enabled = texture_settings.proxy_resolution != "FULL"
+        sub.prop(texture_settings, "proxy_workers")
+        col.prop(texture_settings, "use_proxies", text="Use Proxies")
+
+class VIEW3D_PT_QuickExporter_Sessions(bpy.types.Panel):
+    """Substance Painter Sessions Panel for the addon"""
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "B2SP Linker"
+    bl_label = "Substance Painter Sessions"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        sessions = painter_sessions.sessions()
+        if not sessions:
+            layout.label(text="No sessions started")
+            return
+        col = layout.column(align=True)
+        for folder, pid, exit_code in sessions:
+            row = col.row(align=True)
+            status = "running" if exit_code is None else f"exited ({exit_code})"
+            row.label(text=f"{os.path.basename(folder)}: {status}, pid {pid}", icon="PLAY" if exit_code is None else "X")
+            stop = row.operator(STOP_OT_PainterSession.bl_idname, text="", icon="CANCEL" if exit_code is None else "TRASH")
+            stop.folder = folder
+            stop.pid = pid
+
+class VIEW3D_PT_QuickExporter_Timings(bpy.types.Panel):
+    """Timings Panel showing the last recorded run of the addon"""
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "B2SP Linker"
+    bl_label = "Timings"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        record = instrumentation.last_record
+        if record is None:
+            preferences = context.preferences.addons[__package__].preferences
+            layout.label(text="No run recorded yet" if preferences.record_timings else "Enable Record timings in the addon preferences")
+            return
+        layout.label(text=f"{record['operator']}: {record['duration']:.2f}s", icon="TIME")
+        col = layout.column(align=True)
+        for name, span in record["spans"].items():
+            col.label(text=f"{name}: {span['seconds']:.3f}s ({span['calls']}x)")
+        col = layout.column(align=True)
+        for name, value in record["counters"].items():
+            col.label(text=f"{name}: {value}")
+        if "log" in record:
+            layout.label(text=os.path.basename(record["log"]), icon="TEXT")
 
 class VIEW3D_PT_QuickExporter_Cleanup(bpy.types.Panel):
     """Cleanup Functions Panel for the addon"""
@@ -453,6 +3024,7 @@ class VIEW3D_PT_QuickExporter_Cleanup(bpy.types.Panel):
         texture_settings = context.scene.texture_settings
         col = layout.column()
         col.prop(texture_settings, "remove_all_unused", text="Remove all unused")
+        col.prop(texture_settings, "purge_unused_images")
         col.operator(
             REMOVE_OT_UNUSED_TEXTURES.bl_idname,
             text="Remove unused image textures",
@@ -465,12 +3037,20 @@ class VIEW3D_PT_QuickExporter_Cleanup(bpy.types.Panel):
 classes = (
     FolderPathPreferences,
     TextureSettings,
+    ExportSettings,
+    OperatorProgress,
     VIEW3D_PT_QuickExporter_ExportImport,
+    VIEW3D_PT_QuickExporter_ExportSettings,
     VIEW3D_PT_QuickExporter_ImportSettings,
     EXPORT_OT_SubstancePainterExporter,
     VIEW3D_PT_QuickExporter_Cleanup,
+    VIEW3D_PT_QuickExporter_Sessions,
+    VIEW3D_PT_QuickExporter_Timings,
     OPEN_OT_FBXFolder,
+    STOP_OT_PainterSession,
+    CLEAR_OT_ExportCache,
     IMPORT_OT_Textures,
+    BAKE_OT_SubstancePainterBatch,
     REMOVE_OT_UNUSED_TEXTURES,
 )
 
@@ -479,8 +3059,17 @@ def register():
     for c in classes:
         bpy.utils.register_class(c)
     bpy.types.Scene.texture_settings = bpy.props.PointerProperty(type=TextureSettings)
+    bpy.types.Scene.export_settings = bpy.props.PointerProperty(type=ExportSettings)
+    bpy.types.WindowManager.b2sp_progress = bpy.props.PointerProperty(type=OperatorProgress)
+    bpy.app.handlers.load_post.append(start_live_link_on_load)
 
 def unregister():
+    texture_watcher.stop()
+    background_proxies.stop()
+    if start_live_link_on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(start_live_link_on_load)
+    del bpy.types.WindowManager.b2sp_progress
+    del bpy.types.Scene.export_settings
     del bpy.types.Scene.texture_settings
     for c in reversed(classes):
         bpy.utils.unregister_class(c)
@@ -0,0 +1,191 @@
+"""
+Headless batch round trips for whole asset libraries, run with:
+blender -b -P batch.py -- ASSET.blend|FOLDER [...] [options]
+
+Every .blend file is opened in turn, the matching mesh objects are selected and exported
+through EXPORT_OT_SubstancePainterExporter and/or textured through IMPORT_OT_Textures.
+A json summary with per asset timings and failures is written at the end
+"""
+import bpy
+import addon_utils
+import argparse
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_PATH = os.path.abspath(__file__)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="blender -b -P batch.py --", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help=".blend files or folders searched recursively for .blend files")
+    parser.add_argument("--filter", default="*", help="Only process mesh objects whose name matches this pattern")
+    parser.add_argument("--collection", default="", help="Only process mesh objects in this collection")
+    parser.add_argument("--export", action="store_true", help="Export the objects to the export folder")
+    parser.add_argument("--import", dest="import_textures", action="store_true", help="Import the textures in the export folder")
+    parser.add_argument("--bake", action="store_true", help="Export and texture the objects with the batch texturing command, then import the results")
+    parser.add_argument("--save", action="store_true", help="Save every .blend file after the import")
+    parser.add_argument("--export-folder", default="", help="Overrides the export folder of the addon preferences")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of Blender processes the assets are spread over")
+    parser.add_argument("--summary", default="b2sp_summary.json", help="Path of the json summary")
+    args = parser.parse_args(argv)
+    if not args.export and not args.import_textures and not args.bake:
+        parser.error("nothing to do, pass --export, --import or --bake")
+    return args
+
+
+def find_blend_files(inputs):
+    """Returns the .blend files of the inputs, folders are searched recursively"""
+    files = []
+    for entry in inputs:
+        path = Path(entry)
+        if path.is_dir():
+            files.extend(sorted(str(blend) for blend in path.rglob("*.blend")))
+        else:
+            files.append(str(path))
+    return files
+
+
+def enable_addon(export_folder=""):
+    """Enables the addon this script ships with, also used by benchmark.py, and returns its module"""
+    addon_dir = os.path.dirname(SCRIPT_PATH)
+    for module in addon_utils.modules():
+        if os.path.dirname(os.path.abspath(module.__file__)) == addon_dir:
+            addon_utils.enable(module.__name__, default_set=True)
+            if export_folder:
+                bpy.context.preferences.addons[module.__name__].preferences.export_folder = export_folder
+            return sys.modules[module.__name__]
+    raise RuntimeError(f"No addon found in {addon_dir}")
+
+
+def select_objects(args):
+    """Selects the mesh objects matching the filters and returns them"""
+    view_layer = bpy.context.view_layer
+    if args.collection:
+        candidates = bpy.data.collections[args.collection].all_objects
+    else:
+        candidates = view_layer.objects
+    objects = [
+        obj for obj in candidates
+        if obj.type == "MESH" and fnmatch.fnmatchcase(obj.name, args.filter) and obj.name in view_layer.objects
+    ]
+    for obj in view_layer.objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    view_layer.objects.active = objects[0] if objects else None
+    return objects
+
+
+def run_stage(result, stage, operator, **kwargs):
+    """Runs an operator as a stage of the round trip and records its wall time, raises if it did not finish"""
+    start = time.perf_counter()
+    returned = operator(**kwargs)
+    result[f"{stage}_seconds"] = time.perf_counter() - start
+    if "FINISHED" not in returned:
+        raise RuntimeError(f"{stage} stage: {operator.idname()} returned {returned}")
+
+
+def process_asset(filepath, args):
+    """Runs the round trip of a single .blend file and returns its summary entry"""
+    result = {"file": filepath, "objects": 0, "status": "ok", "error": None}
+    start = time.perf_counter()
+    try:
+        bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+        result["open_seconds"] = time.perf_counter() - start
+        objects = select_objects(args)
+        result["objects"] = len(objects)
+        if not objects:
+            result["status"] = "skipped"
+            return result
+        if args.export:
+            run_stage(result, "export", bpy.ops.export.substance_painter, launch_painter=False)
+        if args.bake:
+            run_stage(result, "bake", bpy.ops.bake.substance_painter)
+        if args.import_textures:
+            run_stage(result, "import", getattr(bpy.ops, "import").textures)
+        if args.save and (args.import_textures or args.bake):
+            run_stage(result, "save", bpy.ops.wm.save_mainfile)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        result["total_seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_jobs(files, args, argv):
+    """Spreads the files over several background Blender processes and returns their summary entries"""
+    work_dir = tempfile.mkdtemp(prefix="b2sp_batch_")
+    # Forward every option except the inputs, the job count and the summary path
+    options = []
+    skip = False
+    for index, value in enumerate(argv):
+        if skip:
+            skip = False
+        elif value in ("--jobs", "--summary"):
+            skip = True
+        elif value.startswith(("--jobs=", "--summary=")):
+            continue
+        elif value.startswith("--"):
+            options.append(value)
+            if value in ("--filter", "--collection", "--export-folder"):
+                options.append(argv[index + 1])
+                skip = True
+    processes = []
+    for index in range(args.jobs):
+        chunk = files[index::args.jobs]
+        if not chunk:
+            continue
+        summary = os.path.join(work_dir, f"summary_{index}.json")
+        command = [bpy.app.binary_path, "-b", "-P", SCRIPT_PATH, "--", *chunk, *options, "--jobs", "1", "--summary", summary]
+        processes.append((subprocess.Popen(command), chunk, summary))
+    assets = []
+    for process, chunk, summary in processes:
+        process.wait()
+        try:
+            with open(summary) as f:
+                assets.extend(json.load(f)["assets"])
+        except (OSError, ValueError):
+            assets.extend(
+                {"file": filepath, "status": "failed", "error": f"Blender exited with code {process.returncode}"}
+                for filepath in chunk
+            )
+    return assets
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+    files = find_blend_files(args.inputs)
+    started = datetime.now(timezone.utc).isoformat()
+    start = time.perf_counter()
+    if args.jobs > 1 and len(files) > 1:
+        assets = run_jobs(files, args, argv)
+    else:
+        enable_addon(args.export_folder)
+        assets = []
+        for filepath in files:
+            result = process_asset(filepath, args)
+            print(f"B2SP batch: {result['status']} {filepath} in {result['total_seconds']:.2f}s")
+            assets.append(result)
+    summary = {
+        "started": started,
+        "total_seconds": time.perf_counter() - start,
+        "assets": assets,
+        "failed": sum(1 for asset in assets if asset["status"] == "failed"),
+    }
+    with open(args.summary, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"B2SP batch: {len(assets)} assets, {summary['failed']} failed, summary written to {args.summary}")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
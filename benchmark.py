@@ -0,0 +1,232 @@
+"""
+Reproducible benchmarks of the export, import and cleanup operators on synthetic scenes, run with:
+blender -b -P benchmark.py -- [--meshes 1 10 100 1000] [--resolutions 256 1024] [--output results.json] [--baseline baseline.json]
+or with the bpy module: python benchmark.py [options]
+
+Every case builds a scene of grid meshes with several material slots, exports it through
+EXPORT_OT_SubstancePainterExporter, writes a flat PBR texture set per material with the
+Painter stand-in, imports it through IMPORT_OT_Textures and cleans it up through
+REMOVE_OT_UNUSED_TEXTURES. The end to end time and the recorded stage timings of every
+operator are written to a json file that later runs can be compared against
+"""
+import bpy
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+from batch import enable_addon  # noqa: E402
+from painter_standin import CHANNELS, write_png  # noqa: E402
+
+# Every setting the operators read, pinned so the startup file the scene comes from never changes the results
+EXPORT_SETTINGS = {
+    "worker_count": 0,
+    "use_export_cache": False,
+    "force_export": False,
+}
+TEXTURE_SETTINGS = {
+    "texture_preset": "DEFAULT",
+    "use_normal_map": True,
+    "use_bump_map": False,
+    "remove_all_unused": True,
+    "purge_unused_images": True,
+    "clear_work_space": True,
+    "import_workers": 4,
+    "proxy_resolution": "FULL",
+    "use_proxies": True,
+    "proxy_workers": 0,
+    "streaming_import": False,
+    "memory_budget": 4096,
+    "use_node_templates": False,
+    "incremental_sync": False,
+    "live_link": False,
+    "purge_superseded_images": True,
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="blender -b -P benchmark.py --", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meshes", type=int, nargs="+", default=[1, 10, 100, 1000], help="Mesh counts of the synthetic scenes")
+    parser.add_argument("--materials", type=int, default=3, help="Material slots per mesh")
+    parser.add_argument("--segments", type=int, default=16, help="Grid segments per side of every mesh")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[256, 1024], help="Resolutions of the texture sets")
+    parser.add_argument("--export-mode", default="PER_OBJECT", choices=("PER_OBJECT", "COMBINED", "PARALLEL"))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case, the fastest one is kept")
+    parser.add_argument("--work-dir", default="", help="Folder the exports and textures are written to, a temporary one by default")
+    parser.add_argument("--output", default="b2sp_benchmark.json", help="Path of the json results")
+    parser.add_argument("--baseline", default="", help="Results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Slowdown against the baseline reported as a regression")
+    return parser.parse_args(argv)
+
+
+def clear_scene():
+    """Removes every object, mesh, material and image so each case starts from the same empty scene"""
+    for collection in (bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.images):
+        for datablock in list(collection):
+            collection.remove(datablock)
+
+
+def build_scene(mesh_count, material_count, segments):
+    """Adds mesh_count grids with a uv map and material_count material slots each, returns them selected"""
+    size = 1.0 / segments
+    vertices = [(x * size, y * size, 0.0) for y in range(segments + 1) for x in range(segments + 1)]
+    faces = [
+        (y * (segments + 1) + x, y * (segments + 1) + x + 1, (y + 1) * (segments + 1) + x + 1, (y + 1) * (segments + 1) + x)
+        for y in range(segments) for x in range(segments)
+    ]
+    collection = bpy.context.scene.collection
+    objects = []
+    for index in range(mesh_count):
+        name = f"Bench_{index:04d}"
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata(vertices, [], faces)
+        mesh.uv_layers.new()
+        for slot in range(material_count):
+            material = bpy.data.materials.new(f"{name}_Mat{slot}")
+            material.use_nodes = True
+            mesh.materials.append(material)
+        mesh.polygons.foreach_set("material_index", [face % material_count for face in range(len(faces))])
+        obj = bpy.data.objects.new(name, mesh)
+        obj.location.x = index * 1.5
+        collection.objects.link(obj)
+        objects.append(obj)
+    view_layer = bpy.context.view_layer
+    view_layer.update()
+    for obj in objects:
+        obj.select_set(True)
+    view_layer.objects.active = objects[0]
+    return objects
+
+
+def write_texture_sets(folder, objects, resolution):
+    """Writes a flat PBR texture set for every material into its object folder, the way Painter exports them"""
+    for obj in objects:
+        obj_folder = os.path.join(folder, obj.name)
+        os.makedirs(obj_folder, exist_ok=True)
+        for material in obj.data.materials:
+            for channel, colour in CHANNELS.items():
+                write_png(os.path.join(obj_folder, f"{material.name}_{channel}.png"), resolution, resolution, colour)
+
+
+def unlink_roughness(objects):
+    """Disconnects the roughness maps so the cleanup has one unused image node per material"""
+    for material in {material for obj in objects for material in obj.data.materials}:
+        principled = next(node for node in material.node_tree.nodes if node.type == "BSDF_PRINCIPLED")
+        roughness = principled.inputs["Roughness"]
+        for link in list(roughness.links):
+            material.node_tree.links.remove(link)
+
+
+def run_operator(addon, operator, **kwargs):
+    """Runs an operator and returns its wall time with the stage timings it recorded"""
+    addon.instrumentation.last_record = None
+    start = time.perf_counter()
+    result = operator(**kwargs)
+    seconds = time.perf_counter() - start
+    if "FINISHED" not in result:
+        raise RuntimeError(f"{operator.idname()} returned {result}")
+    record = addon.instrumentation.last_record or {}
+    return {"seconds": seconds, "spans": record.get("spans", {}), "counters": record.get("counters", {})}
+
+
+def run_case(addon, args, work_dir, mesh_count, resolution):
+    """Runs the export, import and cleanup on a fresh synthetic scene"""
+    export_folder = os.path.join(work_dir, f"meshes_{mesh_count}_res_{resolution}")
+    shutil.rmtree(export_folder, ignore_errors=True)
+    os.makedirs(export_folder)
+    bpy.context.preferences.addons[addon.__name__].preferences.export_folder = export_folder
+    clear_scene()
+    objects = build_scene(mesh_count, args.materials, args.segments)
+    scene = bpy.context.scene
+    scene.export_settings.export_mode = args.export_mode
+    for name, value in EXPORT_SETTINGS.items():
+        setattr(scene.export_settings, name, value)
+    for name, value in TEXTURE_SETTINGS.items():
+        setattr(scene.texture_settings, name, value)
+    case = {}
+    case["export"] = run_operator(addon, bpy.ops.export.substance_painter, launch_painter=False)
+    write_texture_sets(os.path.join(export_folder, objects[0].name), objects, resolution)
+    case["import"] = run_operator(addon, getattr(bpy.ops, "import").textures)
+    unlink_roughness(objects)
+    case["remove_unused"] = run_operator(addon, bpy.ops.remove.unusedtextures)
+    return case
+
+
+def compare(results, baseline, threshold):
+    """Prints the change of every operator against the baseline and returns the regressions"""
+    regressions = []
+    for name, case in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(name)
+        if base_case is None:
+            print(f"B2SP benchmark: {name} is not in the baseline")
+            continue
+        for operator, timing in case.items():
+            base_seconds = base_case.get(operator, {}).get("seconds")
+            if not base_seconds:
+                continue
+            change = timing["seconds"] / base_seconds - 1.0
+            print(f"B2SP benchmark: {name} {operator}: {base_seconds:.3f}s -> {timing['seconds']:.3f}s ({change:+.1%})")
+            if change > threshold:
+                regressions.append(f"{name} {operator}")
+    return regressions
+
+
+def main():
+    if "--" in sys.argv:
+        argv = sys.argv[sys.argv.index("--") + 1:]
+    elif "-P" in sys.argv or "--python" in sys.argv:
+        argv = []
+    else:
+        # Run with the bpy module, the arguments are the script's own
+        argv = sys.argv[1:]
+    args = parse_args(argv)
+    addon = enable_addon()
+    preferences = bpy.context.preferences.addons[addon.__name__].preferences
+    preferences.record_timings = True
+    preferences.profile_runs = False
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="b2sp_benchmark_")
+    results = {
+        "started": datetime.now(timezone.utc).isoformat(),
+        "blender": bpy.app.version_string,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "settings": {
+            "materials": args.materials,
+            "segments": args.segments,
+            "export_mode": args.export_mode,
+            "repeat": args.repeat,
+            "export_settings": EXPORT_SETTINGS,
+            "texture_settings": TEXTURE_SETTINGS,
+        },
+        "cases": {},
+    }
+    for mesh_count in args.meshes:
+        for resolution in args.resolutions:
+            name = f"meshes={mesh_count} resolution={resolution}"
+            runs = [run_case(addon, args, work_dir, mesh_count, resolution) for _ in range(args.repeat)]
+            # Keep the fastest run of every operator, the slower ones mostly measure noise
+            case = {operator: min((run[operator] for run in runs), key=lambda timing: timing["seconds"]) for operator in runs[0]}
+            results["cases"][name] = case
+            print(f"B2SP benchmark: {name} " + ", ".join(f"{operator} {timing['seconds']:.3f}s" for operator, timing in case.items()))
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"B2SP benchmark: results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"B2SP benchmark: {len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
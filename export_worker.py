@@ -0,0 +1,45 @@
+"""
+Background export worker used by the parallel export mode. Started by the addon as:
+blender -b --factory-startup snapshot.blend --python export_worker.py -- job.json
+Exports every object listed in the job file to its own FBX and writes the results as json
+"""
+import bpy
+import json
+import os
+import sys
+import time
+
+
+def export_object(view_layer, obj, filepath, fbx_settings):
+    """Exports a single object in isolation and returns the bytes written and the wall time"""
+    for other in view_layer.objects:
+        other.select_set(False)
+    obj.select_set(True)
+    view_layer.objects.active = obj
+    start = time.perf_counter()
+    bpy.ops.export_scene.fbx(filepath=filepath, use_selection=True, **fbx_settings)
+    return os.path.getsize(filepath), time.perf_counter() - start
+
+
+def main():
+    job_path = sys.argv[sys.argv.index("--") + 1]
+    with open(job_path) as f:
+        job = json.load(f)
+    view_layer = bpy.context.view_layer
+    results = []
+    for entry in job["objects"]:
+        result = {"name": entry["name"], "filepath": entry["filepath"], "size": 0, "duration": 0.0, "error": None}
+        try:
+            obj = bpy.data.objects[entry["name"]]
+            result["size"], result["duration"] = export_object(
+                view_layer, obj, entry["filepath"], job["fbx_settings"]
+            )
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+    with open(job["result_path"], "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
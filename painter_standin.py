@@ -0,0 +1,90 @@
+"""
+Local stand-in for Substance Painter's batch texturing, used to test the batch pipeline without Painter.
+Writes a flat PBR texture set per texture set the way the Painter export would:
+python painter_standin.py --mesh Cube.fbx --output Cube/ --texture-sets Cube_Material [--resolution 256]
+It also stands in for a running Painter session that picks up the meshes handed over in the command file:
+python painter_standin.py --session Export/ [--mesh Cube.fbx]
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+# Written by the addon's session manager into the export folder
+SESSION_FILE = "b2sp_session.json"
+
+# Flat colour per channel, written as <texture set>_<channel>.png
+CHANNELS = {
+    "BaseColor": (200, 200, 200),
+    "Roughness": (128, 128, 128),
+    "Metallic": (0, 0, 0),
+    "Normal": (128, 128, 255),
+}
+
+
+def png_chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def write_png(filepath, width, height, colour):
+    """Writes a solid colour 8 bit rgb png"""
+    row = b"\x00" + bytes(colour) * width
+    compressor = zlib.compressobj(6)
+    pixels = b"".join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(png_chunk(b"IDAT", pixels))
+        f.write(png_chunk(b"IEND", b""))
+
+
+def run_session(folder, meshes, interval=0.5):
+    """Polls the folder for command files until interrupted, loading the meshes of each one"""
+    print(f"Session started with: {', '.join(meshes)}", flush=True)
+    command_path = os.path.join(folder, SESSION_FILE)
+    while True:
+        try:
+            with open(command_path) as f:
+                command = json.load(f)
+        except (OSError, ValueError):
+            time.sleep(interval)
+            continue
+        os.remove(command_path)
+        print(f"Session loaded: {', '.join(command.get('meshes', []))}", flush=True)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Stand-in for Substance Painter batch texturing")
+    parser.add_argument("--mesh", action="append", default=[])
+    parser.add_argument("--output")
+    parser.add_argument("--texture-sets", help="Comma separated texture set names")
+    parser.add_argument("--preset", default="")
+    parser.add_argument("--resolution", type=int, default=256)
+    parser.add_argument("--session", help="Export folder to watch for session command files")
+    args = parser.parse_args(argv)
+    if args.session:
+        try:
+            run_session(args.session, args.mesh)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if len(args.mesh) != 1 or not args.output or not args.texture_sets:
+        parser.error("--mesh, --output and --texture-sets are required outside of a session")
+    args.mesh = args.mesh[0]
+    if not os.path.exists(args.mesh):
+        print(f"Mesh not found: {args.mesh}")
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+    for texture_set in filter(None, args.texture_sets.split(",")):
+        for channel, colour in CHANNELS.items():
+            filepath = os.path.join(args.output, f"{texture_set}_{channel}.png")
+            write_png(filepath, args.resolution, args.resolution, colour)
+            print(f"Wrote {filepath}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
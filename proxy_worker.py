@@ -0,0 +1,51 @@
+"""
+Background proxy worker used by the texture proxies. Started by the addon as:
+blender -b --factory-startup --python proxy_worker.py -- job.json
+Writes a downscaled copy of every texture listed in the job file and writes the results as json
+"""
+import bpy
+import json
+import os
+import sys
+import time
+
+FILE_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG"}
+
+
+def write_proxy(source, proxy, resolution):
+    """Scales the texture so its longest side is resolution and saves it to proxy, returns the wall time"""
+    start = time.perf_counter()
+    image = bpy.data.images.load(source)
+    try:
+        # Keep the pixel values as they are, colour and data maps alike
+        image.colorspace_settings.name = "Non-Color"
+        width, height = image.size
+        scale = resolution / max(width, height)
+        image.scale(max(1, round(width * scale)), max(1, round(height * scale)))
+        os.makedirs(os.path.dirname(proxy), exist_ok=True)
+        image.filepath_raw = proxy
+        image.file_format = FILE_FORMATS[os.path.splitext(proxy)[1].lower()]
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+    return time.perf_counter() - start
+
+
+def main():
+    job_path = sys.argv[sys.argv.index("--") + 1]
+    with open(job_path) as f:
+        job = json.load(f)
+    results = []
+    for entry in job["images"]:
+        result = {"source": entry["source"], "proxy": entry["proxy"], "duration": 0.0, "error": None}
+        try:
+            result["duration"] = write_proxy(entry["source"], entry["proxy"], job["resolution"])
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+    with open(job["result_path"], "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()